@@ -30,6 +30,7 @@ def parse_one(fp):
         "connected_final": d.get("connected"),
         "snapshots_connected_pct": d.get("snapshots_connected_pct"),
         "evals_used": d.get("E_used"),
+        "revisits_charged": d.get("E_revisits"),
         "wallclock_s": d.get("wallclock_s"),
     }
     return out
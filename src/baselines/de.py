@@ -1,16 +1,24 @@
 
 import random, math
 from typing import Dict, Any, List
-from ca_alns.eval import fitness_value, fitness_wrapped, EvalCounter
+from ca_alns.eval import fitness_value, fitness_wrapped, fitness_batch_wrapped, EvalCounter, BudgetExhausted, FitnessCache
+from ca_alns.budget import Deadline
 
 class DE:
-    def __init__(self, fitness_penalties: dict, E_max: int, seed: int = 0, pop_size: int = 30, F: float = 0.5, CR: float = 0.8):
+    def __init__(self, fitness_penalties: dict, E_max: int, seed: int = 0, pop_size: int = 30, F: float = 0.5, CR: float = 0.8,
+                 cache_size: int = None, cache_bytes: int = None, store=None,
+                 eval_counter=None, T_max: float = None, deadline: Deadline = None, free_revisits: int = 50):
         self.penalties = fitness_penalties
-        self.eval_counter = EvalCounter(E_max=E_max)
+        self.eval_counter = eval_counter if eval_counter is not None else EvalCounter(E_max=E_max)
         self.rng = random.Random(seed)
         self.pop_size = pop_size
         self.F = F; self.CR = CR
-        self.cache = {}
+        self.cache = FitnessCache(max_entries=cache_size, max_bytes=cache_bytes)
+        self.store = store   # optional persistent FitnessStore
+        self.deadline = deadline if deadline is not None else Deadline(T_max)
+        # cache hits in a row that cost no budget; each further one is charged to E_max as a revisit
+        # (not in E_used), as in CA-ALNS, so a population of identical solutions still ends the run
+        self.free_revisits = free_revisits
 
     def _vec(self, sol: Dict[str,Any]) -> float:
         return sol.get('total_travel', 100.0)
@@ -22,23 +30,36 @@ class DE:
 
     def run(self, seed_sol: Dict[str,Any]) -> Dict[str,Any]:
         pop = [seed_sol.copy() for _ in range(self.pop_size)]
-        scores = [fitness_wrapped(fitness_value, self.eval_counter, self.cache, ind, self.penalties) for ind in pop]
+        scores = fitness_batch_wrapped(self.eval_counter, self.cache, pop, self.penalties, store=self.store).tolist()
         best_idx = min(range(len(scores)), key=lambda i: scores[i])
         best = pop[best_idx].copy(); best['fitness'] = scores[best_idx]
 
-        while self.eval_counter.used < self.eval_counter.E_max:
+        stopped_by, idle = 'E_max', 0
+        while stopped_by == 'E_max' and not self.eval_counter.exhausted():
             for i in range(self.pop_size):
-                if self.eval_counter.used >= self.eval_counter.E_max:
+                if self.eval_counter.exhausted():
                     break
+                if self.deadline.expired():
+                    stopped_by = 'T_max'; break
                 idxs = [idx for idx in range(self.pop_size) if idx != i]
                 a,b,c = self.rng.sample(idxs, 3)
                 x = self._vec(pop[i]); va = self._vec(pop[a]); vb = self._vec(pop[b]); vc = self._vec(pop[c])
                 trial_val = x if self.rng.random() > self.CR else (va + self.F*(vb - vc))
                 trial = self._from_vec(trial_val, pop[i])
-                J_trial = fitness_wrapped(fitness_value, self.eval_counter, self.cache, trial, self.penalties)
+                used = self.eval_counter.used
+                try:
+                    J_trial = fitness_wrapped(fitness_value, self.eval_counter, self.cache, trial, self.penalties, store=self.store)
+                    idle = idle + 1 if self.eval_counter.used == used else 0
+                    if idle > self.free_revisits:
+                        self.eval_counter.revisit(1)
+                except BudgetExhausted:   # a shared budget can run dry between checks
+                    break
                 if J_trial < scores[i]:
                     pop[i] = trial; scores[i] = J_trial
                     if J_trial < best['fitness']:
                         best = trial.copy(); best['fitness'] = J_trial
         best['E_used'] = self.eval_counter.used
+        best['E_revisits'] = self.eval_counter.revisits
+        best['stopped_by'] = stopped_by
+        best['wallclock_s'] = self.deadline.elapsed()
         return best
@@ -1,16 +1,24 @@
 
 import random, math
 from typing import Dict, Any, List
-from ca_alns.eval import fitness_value, fitness_wrapped, EvalCounter
+from ca_alns.eval import fitness_value, fitness_wrapped, fitness_batch_wrapped, EvalCounter, BudgetExhausted, FitnessCache
+from ca_alns.budget import Deadline
 
 class GA:
-    def __init__(self, fitness_penalties: dict, E_max: int, seed: int = 0, pop_size: int = 50, p_mut: float = 0.1):
+    def __init__(self, fitness_penalties: dict, E_max: int, seed: int = 0, pop_size: int = 50, p_mut: float = 0.1,
+                 cache_size: int = None, cache_bytes: int = None, store=None,
+                 eval_counter=None, T_max: float = None, deadline: Deadline = None, free_revisits: int = 50):
         self.penalties = fitness_penalties
-        self.eval_counter = EvalCounter(E_max=E_max)
+        self.eval_counter = eval_counter if eval_counter is not None else EvalCounter(E_max=E_max)
         self.rng = random.Random(seed)
         self.pop_size = pop_size
         self.p_mut = p_mut
-        self.cache = {}
+        self.cache = FitnessCache(max_entries=cache_size, max_bytes=cache_bytes)
+        self.store = store   # optional persistent FitnessStore
+        self.deadline = deadline if deadline is not None else Deadline(T_max)
+        # cache hits in a row that cost no budget; each further one is charged to E_max as a revisit
+        # (not in E_used), as in CA-ALNS, so a population of identical solutions still ends the run
+        self.free_revisits = free_revisits
 
     def _mutate(self, sol: Dict[str,Any]) -> Dict[str,Any]:
         s = sol.copy()
@@ -20,18 +28,31 @@ class GA:
 
     def run(self, seed_sol: Dict[str,Any]) -> Dict[str,Any]:
         pop = [seed_sol.copy() for _ in range(self.pop_size)]
-        scores = [fitness_wrapped(fitness_value, self.eval_counter, self.cache, ind, self.penalties) for ind in pop]
+        scores = fitness_batch_wrapped(self.eval_counter, self.cache, pop, self.penalties, store=self.store).tolist()
         best_idx = min(range(len(scores)), key=lambda i: scores[i])
         best = pop[best_idx].copy(); best['fitness'] = scores[best_idx]
-        while self.eval_counter.used < self.eval_counter.E_max:
+        stopped_by, idle = 'E_max', 0
+        while not self.eval_counter.exhausted():
+            if self.deadline.expired():
+                stopped_by = 'T_max'; break
             i,j = self.rng.randrange(self.pop_size), self.rng.randrange(self.pop_size)
             parent = pop[i] if scores[i] < scores[j] else pop[j]
             child = self._mutate(parent)
-            J = fitness_wrapped(fitness_value, self.eval_counter, self.cache, child, self.penalties)
+            used = self.eval_counter.used
+            try:
+                J = fitness_wrapped(fitness_value, self.eval_counter, self.cache, child, self.penalties, store=self.store)
+                idle = idle + 1 if self.eval_counter.used == used else 0
+                if idle > self.free_revisits:
+                    self.eval_counter.revisit(1)
+            except BudgetExhausted:   # a shared budget can run dry between checks
+                break
             # replace worst
             worst_idx = max(range(len(scores)), key=lambda k: scores[k])
             pop[worst_idx] = child; scores[worst_idx] = J
             if J < best['fitness']:
                 best = child.copy(); best['fitness'] = J
         best['E_used'] = self.eval_counter.used
+        best['E_revisits'] = self.eval_counter.revisits
+        best['stopped_by'] = stopped_by
+        best['wallclock_s'] = self.deadline.elapsed()
         return best
@@ -0,0 +1,81 @@
+"""Block-wise adaptive roulette-wheel operator selection with cost instrumentation.
+
+Each call is scored w1 (new global best), w2 (improved the current solution), w3 (accepted) or 0;
+the caller passes outcome None for already-visited solutions.
+At the end of a block an operator's weight moves towards its reward with reaction factor r:
+    w <- (1 - r) * w + r * reward
+reward_mode chooses what the score is normalised by:
+    'call' - score per call (classic ALNS)
+    'time' - score per second of the operator's wall time
+    'eval' - score per fitness evaluation it consumed
+The reward is the operator's mean score per call divided by its cost ratio: its own mean cost
+per call over the block's mean cost per call (all operators). In 'call' mode the ratio is 1, so all
+modes share the per-call scale of w1..w3, and an operator that is 10x slower for the same score per
+call gets 1/10 of the reward. The ratio is clipped symmetrically to [1/cost_ratio_cap, cost_ratio_cap]
+so a nearly free operator (e.g. all its candidates were cache hits) cannot get an unbounded reward.
+"""
+from dataclasses import dataclass, asdict
+from typing import Dict, List, Optional
+
+@dataclass
+class OperatorStats:
+    weight: float = 1.0
+    calls: int = 0
+    evals: int = 0
+    time_s: float = 0.0
+    n_best: int = 0
+    n_better: int = 0
+    n_accepted: int = 0
+    # current block
+    b_calls: int = 0
+    b_evals: int = 0
+    b_time: float = 0.0
+    b_score: float = 0.0
+
+class AdaptiveWeights:
+    def __init__(self, names: List[str], w1: float, w2: float, w3: float, reaction: float = 0.2,
+                 reward_mode: str = "call", w_min: float = 0.05, cost_ratio_cap: float = 10.0):
+        if reward_mode not in ("call", "time", "eval"):
+            raise ValueError(f"Unknown reward_mode {reward_mode!r}")
+        self.names = list(names)
+        self.scores = {'best': w1, 'better': w2, 'accepted': w3}
+        self.reaction = reaction
+        self.reward_mode = reward_mode
+        self.w_min = w_min
+        self.cost_ratio_cap = cost_ratio_cap
+        self.ops: Dict[str, OperatorStats] = {n: OperatorStats() for n in self.names}
+
+    def select(self, rng) -> str:
+        total = sum(self.ops[n].weight for n in self.names)
+        x = rng.random() * total
+        for n in self.names:
+            x -= self.ops[n].weight
+            if x <= 0:
+                return n
+        return self.names[-1]
+
+    def record(self, name: str, outcome: Optional[str], time_s: float, evals: int):
+        st = self.ops[name]
+        st.calls += 1; st.evals += evals; st.time_s += time_s
+        st.b_calls += 1; st.b_evals += evals; st.b_time += time_s
+        if outcome is not None:
+            st.b_score += self.scores[outcome]
+            setattr(st, 'n_' + outcome, getattr(st, 'n_' + outcome) + 1)
+
+    def end_block(self):
+        used = [self.ops[n] for n in self.names if self.ops[n].b_calls]
+        calls = sum(st.b_calls for st in used)
+        if calls:
+            cost = lambda st: {'call': st.b_calls, 'time': st.b_time, 'eval': st.b_evals}[self.reward_mode]
+            per_call = sum(cost(st) for st in used) / calls
+            cap = self.cost_ratio_cap
+            for st in used:
+                ratio = cost(st) / st.b_calls / per_call if per_call > 0 else 1.0
+                reward = st.b_score / st.b_calls / min(max(ratio, 1.0 / cap), cap)
+                st.weight = max(self.w_min, (1 - self.reaction) * st.weight + self.reaction * reward)
+        for st in self.ops.values():
+            st.b_calls = st.b_evals = 0
+            st.b_time = st.b_score = 0.0
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        return {n: {k: v for k, v in asdict(st).items() if not k.startswith('b_')} for n, st in self.ops.items()}
@@ -0,0 +1,120 @@
+"""Evaluation budget shared by concurrent workers (threads or processes).
+
+SharedEvalBudget holds one lock-protected counter in shared memory. Workers draw evaluations in
+blocks (reserve) so the lock is taken once per block rather than once per evaluation, and give
+the unused remainder back when they finish (release). Each worker's consumption is written to its
+own shared slots (evaluations and charged revisits apart), so per-worker counts are exact and the
+sum of both never exceeds E_max.
+
+The object must reach child processes as a Process argument (shared ctypes cannot go through a
+Pool's task queue).
+
+Deadline enforces the wall-clock budget (BudgetConfig.T_max) with a monotonic clock read only
+every `every` checks.
+"""
+import multiprocessing as mp
+import time
+from typing import List, Optional
+
+from .eval import BudgetExhausted
+
+class SharedEvalBudget:
+    def __init__(self, E_max: int, n_workers: int = 1, block: int = 64, ctx=None):
+        ctx = ctx or mp.get_context()
+        self.E_max = E_max
+        self.block = max(1, block)
+        self._lock = ctx.Lock()
+        self._reserved = ctx.Value('q', 0, lock=False)          # handed out to workers (incl. unused)
+        self._used = ctx.Array('q', max(1, n_workers), lock=False)   # evaluations, per worker
+        self._revisits = ctx.Array('q', max(1, n_workers), lock=False)   # charged revisits, per worker
+
+    def reserve(self, n: int) -> int:
+        """Take up to n evaluations from the pool; returns how many were granted."""
+        with self._lock:
+            grant = max(0, min(n, self.E_max - self._reserved.value))
+            self._reserved.value += grant
+        return grant
+
+    def give_back(self, n: int):
+        if n > 0:
+            with self._lock:
+                self._reserved.value -= n
+
+    def remaining(self) -> int:
+        with self._lock:
+            return self.E_max - self._reserved.value
+
+    @property
+    def used(self) -> int:
+        return int(sum(self._used[:]))
+
+    @property
+    def revisits(self) -> int:
+        return int(sum(self._revisits[:]))
+
+    def per_worker(self) -> List[int]:
+        return [int(x) for x in self._used[:]]
+
+    def worker(self, wid: int) -> 'WorkerBudget':
+        return WorkerBudget(self, wid)
+
+class WorkerBudget:
+    """EvalCounter-compatible view of a SharedEvalBudget for one worker.
+    used/revisits: this worker's evaluations and charged revisits; E_max: the global budget (test with
+    exhausted(), not used >= E_max)."""
+    def __init__(self, shared: SharedEvalBudget, wid: int):
+        self.shared = shared
+        self.wid = wid
+        self.E_max = shared.E_max
+        self.used = 0
+        self.revisits = 0
+        self._local = 0    # reserved, not yet consumed
+
+    def tick(self, n: int = 1):
+        self._draw(n)
+        self.used += n
+        self.shared._used[self.wid] += n   # own slot: no lock needed
+
+    def revisit(self, n: int = 1):
+        self._draw(n)
+        self.revisits += n
+        self.shared._revisits[self.wid] += n
+
+    def _draw(self, n: int):
+        if n > self._local:
+            self._local += self.shared.reserve(max(self.shared.block, n - self._local))
+        if n > self._local:
+            raise BudgetExhausted(f"Evaluation budget exceeded: worker {self.wid} needs {n}, "
+                                  f"{self._local} left of E_max={self.E_max}")
+        self._local -= n
+
+    def exhausted(self) -> bool:
+        return self._local == 0 and self.shared.remaining() <= 0
+
+    def release(self):
+        """Return the unused part of the current reservation to the pool."""
+        self.shared.give_back(self._local)
+        self._local = 0
+
+class Deadline:
+    """Wall-clock budget. T_max None/0 never expires. t_end (a time.monotonic() value) pins an
+    absolute deadline, e.g. one shared by several worker processes on the same machine."""
+    def __init__(self, T_max: Optional[float] = None, every: int = 16, t_end: Optional[float] = None):
+        self.t_start = time.monotonic()
+        self.t_end = t_end if t_end is not None else (self.t_start + T_max if T_max else None)
+        self.every = max(1, every)
+        self._n = 0
+        self._expired = False
+
+    def expired(self, now: bool = False) -> bool:
+        """True once the deadline has passed; the clock is read every `every` calls (always if now)."""
+        if self.t_end is None or self._expired:
+            return self._expired
+        self._n += 1
+        if now or self._n >= self.every:
+            self._n = 0
+            self._expired = time.monotonic() >= self.t_end
+        return self._expired
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.t_start
@@ -1,6 +1,8 @@
 
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass, is_dataclass
 from typing import Optional, Dict
+import hashlib
+import json
 
 @dataclass
 class ConnectivityConfig:
@@ -9,11 +11,17 @@ class ConnectivityConfig:
     rho: float = 15.0
     v_max: float = 15.0
     delta_tau: Optional[float] = None
+    # snapshot streaming: chunk size and visiting order ('time' or 'risk')
+    snapshot_chunk: int = 256
+    snapshot_order: str = "time"
+    # 'sampled' (delta_tau cadence) or 'kinetic' (exact, event-driven)
+    verification: str = "sampled"
     # SINR-specific
     tx_power_dbm: float = 20.0
     noise_dbm: float = -96.0
     gamma_th_db: float = 6.0
     bidirectional: bool = True
+    interference: bool = False   # aggregate interference from all other concurrent transmitters
 
 @dataclass
 class OperatorConfig:
@@ -23,8 +31,17 @@ class OperatorConfig:
     weights_w1: float = 5.0
     weights_w2: float = 2.0
     weights_w3: float = 0.5
-    k_regret: int = 2           # 2 or 3
-    apply_local_search: bool = False
+    reaction: float = 0.2       # weight reaction factor per block
+    reward_mode: str = "call"   # operator reward per 'call', per second ('time') or per evaluation ('eval')
+    k_regret: int = 3           # regret-2 .. regret-k_regret repairs are registered
+    q_min: int = 2              # targets removed per destroy: uniform in [q_min, q_max_frac * n_targets]
+    q_max_frac: float = 0.2
+    shaw_k: int = 10            # neighbour-list length for Shaw removal
+    free_revisits: int = 50     # cache hits in a row that cost no budget; each further one is charged as a revisit
+    revisit_noise: float = 0.1  # insertion-cost noise per cache hit in a row (capped at 1), see operators.py
+    apply_local_search: bool = False   # neighbour-list local search after every repair (alns-ls)
+    ls_k: int = 10              # neighbour-list length for local search moves
+    ls_max_moves: int = 1000    # improving moves per local search call
     use_rally_points: bool = True
     warm_blocks: int = 3
     p_warm: float = 1e-2
@@ -33,6 +50,13 @@ class OperatorConfig:
 class BudgetConfig:
     E_max: int = 100000
     T_max: Optional[float] = None
+    time_check_every: int = 16   # iterations between monotonic-clock reads when T_max is set
+    # fitness cache bounds (LRU eviction); None = unbounded
+    cache_size: Optional[int] = 1_000_000
+    cache_bytes: Optional[int] = None
+    # persistent SQLite fitness store shared across runs; hits charged to E_max unless disabled
+    disk_cache: Optional[str] = None
+    charge_disk_hits: bool = True
 
 @dataclass
 class PenaltyConfig:
@@ -53,3 +77,9 @@ class ExperimentConfig:
     operators: OperatorConfig
     budget: BudgetConfig
     penalties: PenaltyConfig
+
+def config_fingerprint(cfg) -> str:
+    """Stable digest of a config dataclass (e.g. ConnectivityConfig) or a JSON-able dict, for
+    persistent cache keys."""
+    payload = json.dumps(asdict(cfg) if is_dataclass(cfg) else cfg, sort_keys=True, separators=(',',':'), default=str)
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
@@ -0,0 +1,97 @@
+"""Per-solution connectivity cache with time-window re-verification.
+
+A route edit on UAV u at position p leaves u's motion unchanged until it departs item p-1, and
+leaves every other UAV untouched. ConnectivityCache keeps the sampled positions, per-snapshot
+verdicts and margins of a solution; after an edit only u's column is re-sampled, and only the
+snapshots from the edit time onwards are re-verified.
+"""
+import math
+from typing import Dict, List, Optional
+import numpy as np
+
+from .connectivity import critical_radius, check_connected_batch
+from .problem import Instance, RouteItem, route_timeline, uav_timelines, positions_at
+
+def edit_start_time(route: List[RouteItem], pos: int, v: float) -> float:
+    """Time at which a UAV departs item pos-1: an edit at positions >= pos cannot change earlier motion."""
+    if pos <= 0:
+        return 0.0
+    t = 0.0
+    for i in range(pos - 1):
+        a, b = route[i], route[i+1]
+        t += math.hypot(a.x - b.x, a.y - b.y) / max(v, 1e-6) + max(b.wait, 0.0)
+    return t
+
+class ConnectivityCache:
+    def __init__(self, sol, inst: Instance, cfg, delta_tau: float):
+        self.inst, self.cfg, self.delta_tau = inst, cfg, delta_tau
+        self._col = {u.id: j for j, u in enumerate(inst.uavs)}
+        self.timelines = uav_timelines(sol, inst)
+        self.times = np.zeros(0)
+        self.P = np.zeros((0, len(inst.uavs), 2))
+        self.ok = np.zeros(0, dtype=bool)
+        self.margin = np.zeros(0)
+        self.reverified = 0   # snapshots re-checked by update() calls
+        self._resample(0)
+
+    def _horizon_len(self) -> int:
+        horizon = max((t[-1] for t, _ in self.timelines if len(t)), default=0.0)
+        return int(math.ceil(horizon / max(self.delta_tau, 1e-6))) + 1
+
+    def _verify(self, P: np.ndarray):
+        if getattr(self.cfg, "mode", "range") == "range":
+            margin = max(0.0, self.cfg.R - self.cfg.rho) - critical_radius(P)
+            return margin >= 0, margin
+        return check_connected_batch(P, self.cfg), np.full(len(P), np.nan)
+
+    def _resample(self, k0: int, cols: Optional[List[int]] = None):
+        """Resize to the current horizon, re-sample `cols` (all if None) from k0 on, re-verify from k0."""
+        K_old, K = len(self.times), self._horizon_len()
+        self.times = np.arange(K) * self.delta_tau
+        P = np.empty((K, len(self.timelines), 2))
+        keep = min(K_old, K)
+        P[:keep] = self.P[:keep]
+        cols = range(len(self.timelines)) if cols is None else cols
+        for j, (t, pts) in enumerate(self.timelines):
+            # edited columns from k0, every column on snapshots beyond the old horizon
+            start = min(k0, K) if j in cols else keep
+            if start < K:
+                P[start:, j] = positions_at(t, pts, self.times[start:])
+        self.P = P
+        ok, margin = np.empty(K, dtype=bool), np.empty(K)
+        ok[:keep], margin[:keep] = self.ok[:keep], self.margin[:keep]
+        k0 = min(k0, keep)
+        if k0 < K:
+            ok[k0:], margin[k0:] = self._verify(P[k0:])
+            self.reverified += K - k0
+        self.ok, self.margin = ok, margin
+
+    def copy(self) -> 'ConnectivityCache':
+        """Independent cache for an edited copy of the solution; arrays are shared until update()
+        replaces them."""
+        other = object.__new__(ConnectivityCache)
+        other.__dict__.update(self.__dict__)
+        other.timelines = list(self.timelines)
+        return other
+
+    @property
+    def connected(self) -> bool:
+        return bool(self.ok.all())
+
+    def first_violation(self) -> Optional[float]:
+        bad = np.flatnonzero(~self.ok)
+        return float(self.times[bad[0]]) if len(bad) else None
+
+    def update(self, sol, edits: Dict[int, float]):
+        """Re-verify after route edits. edits: {uav_id: t_from}, the time before which that UAV's
+        motion is unchanged (see edit_start_time)."""
+        if not edits:
+            return
+        cols = []
+        for uid in edits:
+            j = self._col[uid]
+            self.timelines[j] = route_timeline(sol.routes[uid], self.inst.uavs[j].v_max)
+            cols.append(j)
+        t_from = min(edits.values())
+        k0 = int(np.searchsorted(self.times, t_from, side='left'))
+        self._resample(k0, cols)
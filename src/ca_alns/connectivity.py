@@ -1,7 +1,8 @@
 
 import math
 from collections import deque, defaultdict
-from typing import Dict, Set
+from dataclasses import dataclass
+from typing import Dict, Set, Optional
 
 def compute_cadence_bound(R: float, rho: float, v_max: float) -> float:
     return max(1e-3, (R - 2.0*rho) / (2.0 * max(v_max, 1e-6)))
@@ -29,7 +30,8 @@ def build_snapshot_graph(positions: dict, cfg) -> dict:
                                    tx_power_dbm=getattr(cfg, "tx_power_dbm", 20.0),
                                    noise_dbm=getattr(cfg, "noise_dbm", -96.0),
                                    gamma_th_db=getattr(cfg, "gamma_th_db", 6.0),
-                                   bidirectional=getattr(cfg, "bidirectional", True))
+                                   bidirectional=getattr(cfg, "bidirectional", True),
+                                   interference=getattr(cfg, "interference", False))
     else:
         # default range with tightened margin (R-ρ)
         R_eff = max(0.0, getattr(cfg, "R", 150.0) - getattr(cfg, "rho", 15.0))
@@ -81,47 +83,48 @@ def snapshot_graph_sinr(positions: dict,
                         noise_dbm=-96.0,
                         gamma_th_db=6.0,
                         bidirectional=True,
-                        altitude_m: float = 100.0):
+                        altitude_m: float = 100.0,
+                        interference: bool = False):
     ids = list(positions.keys())
     edges = {u:set() for u in ids}
-    for i,u in enumerate(ids):
-        xu,yu,*_ = positions[u]
-        for v in ids[i+1:]:
-            xv,yv,*_ = positions[v]
-            d = max(1.0, math.hypot(xu-xv, yu-yv))
-            # crude LoS decision by distance
-            los = d < 500.0
-            prx_uv = rx_power_dbm(tx_power_dbm, d, los=los)
-            prx_vu = prx_uv  # symmetric here
-            sinr_uv = sinr_db(prx_uv, noise_dbm, inter_dbm_list=None)
-            sinr_vu = sinr_db(prx_vu, noise_dbm, inter_dbm_list=None)
-            ok = (sinr_uv >= gamma_th_db) and (sinr_vu >= gamma_th_db) if bidirectional else ((sinr_uv >= gamma_th_db) or (sinr_vu >= gamma_th_db))
-            if ok:
-                edges[u].add(v); edges[v].add(u)
+    if len(ids) < 2:
+        return edges
+    D = pairwise_distances([positions[u][:2] for u in ids])
+    A = sinr_adjacency(D, tx_power_dbm, noise_dbm, gamma_th_db, bidirectional=bidirectional, interference=interference)
+    for i, j in zip(*np.nonzero(np.triu(A, 1))):
+        edges[ids[i]].add(ids[j]); edges[ids[j]].add(ids[i])
     return edges
 
-
 import numpy as np
 
-def laplacian_lambda2(adj_dict):
-    ids = list(adj_dict.keys())
-    idx = {u:i for i,u in enumerate(ids)}
-    n = len(ids)
-    if n == 0:
-        return 0.0
-    A = np.zeros((n,n), dtype=float)
-    for u, nbrs in adj_dict.items():
-        for v in nbrs:
-            if u in idx and v in idx:
-                A[idx[u], idx[v]] = 1.0
-                A[idx[v], idx[u]] = 1.0
-    d = np.diag(A.sum(axis=1))
-    L = d - A
-    w = np.linalg.eigvals(L)
-    w = np.sort(np.real(w))
-    if len(w) < 2:
+try:
+    import scipy.sparse as _sparse
+    from scipy.sparse.linalg import eigsh as _eigsh
+except Exception:
+    _sparse = None
+
+def laplacian_lambda2(adj, dense_below: int = 300) -> float:
+    """Algebraic connectivity (second-smallest Laplacian eigenvalue) of a snapshot graph.
+    adj: dict-of-sets adjacency or boolean (n, n) matrix.
+    Disconnected graphs short-circuit to 0 after a BFS. Graphs with n >= dense_below use a
+    sparse Laplacian and shift-invert Lanczos (eigsh) for the two smallest eigenpairs; below that
+    dense eigh is faster (measured crossover on random geometric graphs: ~250-300 nodes).
+    """
+    A = adjacency_matrix(adj, list(adj.keys())) if isinstance(adj, dict) else np.asarray(adj, dtype=bool)
+    n = A.shape[0]
+    A = A & ~np.eye(n, dtype=bool)
+    if n < 2 or not bfs_connected_batch(A[None])[0]:
         return 0.0
-    return float(w[1])
+    deg = A.sum(axis=1).astype(float)
+    if _sparse is not None and n >= dense_below:
+        L = _sparse.diags(deg) - _sparse.csr_matrix(A, dtype=float)
+        try:
+            # shift-invert Lanczos around 0: the two smallest eigenvalues are 0 and lambda2
+            w = _eigsh(L.tocsc(), k=2, sigma=-1e-3, which='LM', return_eigenvectors=False, tol=1e-10)
+            return max(0.0, float(np.sort(w)[1]))
+        except Exception:
+            pass
+    return float(np.linalg.eigvalsh(np.diag(deg) - A.astype(float))[1])
 
 def avg_degree(adj_dict):
     if not adj_dict:
@@ -164,3 +167,167 @@ def mst_max_edge_length(positions: dict):
             if used == len(ids)-1:
                 break
     return float(max_edge)
+
+# ---- Batch snapshot engine (vectorized over K snapshots) ----
+
+def pairwise_distances(positions) -> np.ndarray:
+    """Euclidean distance matrices for positions of shape (..., U, 2|3); only x,y are used."""
+    P = np.asarray(positions, dtype=float)[..., :2]
+    diff = P[..., :, None, :] - P[..., None, :, :]
+    return np.hypot(diff[..., 0], diff[..., 1])
+
+def _sinr_db_matrix(D: np.ndarray, tx_power_dbm: float, noise_dbm: float,
+                    n_los=2.1, n_nlos=3.0, pl0_db=32.4) -> np.ndarray:
+    """Vectorized counterpart of sinr_db(rx_power_dbm(...), noise_dbm) without interference."""
+    d = np.maximum(D, 1.0)
+    n = np.where(d < 500.0, n_los, n_nlos)
+    pl = np.where(d <= 1.0, pl0_db, pl0_db + 10.0*n*np.log10(d))
+    noise_db = 10.0*np.log10(max(10**(noise_dbm/10.0), 1e-12))
+    return (tx_power_dbm - pl) - noise_db
+
+def build_snapshot_adjacency_batch(positions, cfg) -> np.ndarray:
+    """Boolean adjacency tensor (K, U, U) for positions of shape (K, U, 2|3).
+    Same edge rule as build_snapshot_graph ('range' with R-rho margin, or 'sinr')."""
+    return adjacency_from_distances(pairwise_distances(positions), cfg)
+
+def rx_power_mw_matrix(D: np.ndarray, tx_power_dbm: float, n_los=2.1, n_nlos=3.0, pl0_db=32.4) -> np.ndarray:
+    """Received power (mW, linear scale) for distance matrices D (..., U, U); same channel as rx_power_dbm.
+    The diagonal (a node receiving itself) is zeroed."""
+    d = np.maximum(D, 1.0)
+    P = 10**((tx_power_dbm - pl0_db)/10.0) * d ** -np.where(d < 500.0, n_los, n_nlos)
+    U = P.shape[-1]
+    P[..., np.arange(U), np.arange(U)] = 0.0
+    return P
+
+def sinr_adjacency(D: np.ndarray, tx_power_dbm: float, noise_dbm: float, gamma_th_db: float,
+                   bidirectional: bool = True, interference: bool = False) -> np.ndarray:
+    """SINR link rule on distance matrices D (..., U, U), all in linear scale.
+    With interference, every other node transmits concurrently: the interference on link i->j is
+    the total power received at j minus the power from i (column sums of the rx-power matrix)."""
+    P = rx_power_mw_matrix(D, tx_power_dbm)
+    denom = np.full_like(P, max(10**(noise_dbm/10.0), 1e-12))
+    if interference:
+        denom = denom + (P.sum(axis=-2, keepdims=True) - P)
+    ok = P >= 10**(gamma_th_db/10.0) * denom      # ok[..., i, j]: j decodes i
+    ok_t = np.swapaxes(ok, -1, -2)
+    return ok & ok_t if bidirectional else ok | ok_t
+
+def adjacency_from_distances(D: np.ndarray, cfg) -> np.ndarray:
+    """Boolean adjacency for distance matrices D (..., U, U) under the link rule in cfg."""
+    if getattr(cfg, "mode", "range") == "sinr":
+        A = sinr_adjacency(D, getattr(cfg, "tx_power_dbm", 20.0), getattr(cfg, "noise_dbm", -96.0),
+                           getattr(cfg, "gamma_th_db", 6.0), bidirectional=getattr(cfg, "bidirectional", True),
+                           interference=getattr(cfg, "interference", False))
+    else:
+        R_eff = max(0.0, getattr(cfg, "R", 150.0) - getattr(cfg, "rho", 15.0))
+        A = D <= R_eff
+    U = A.shape[-1]
+    A[..., np.arange(U), np.arange(U)] = False
+    return A
+
+def bfs_connected_batch(adj: np.ndarray) -> np.ndarray:
+    """Connectivity verdict per snapshot for an adjacency tensor (K, U, U).
+    Frontier expansion from node 0, done for all snapshots at once."""
+    adj = np.asarray(adj, dtype=bool)
+    K, U = adj.shape[0], adj.shape[-1]
+    if U <= 1:
+        return np.ones(K, dtype=bool)
+    A = adj.astype(np.float32)
+    reach = np.zeros((K, U), dtype=bool)
+    reach[:, 0] = True
+    for _ in range(U - 1):
+        nxt = reach | (np.matmul(reach[:, None, :].astype(np.float32), A)[:, 0, :] > 0)
+        if np.array_equal(nxt, reach):
+            break
+        reach = nxt
+    return reach.all(axis=1)
+
+def check_connected_batch(positions, cfg, return_adjacency: bool = False):
+    """Connectivity verdicts (K,) for all snapshots in positions (K, U, 2|3).
+    If return_adjacency, also return the (K, U, U) boolean adjacency tensor."""
+    A = build_snapshot_adjacency_batch(positions, cfg)
+    ok = bfs_connected_batch(A)
+    return (ok, A) if return_adjacency else ok
+
+# ---- Dict-of-sets adjacency helpers ----
+
+def adjacency_matrix(adj: Dict[int, Set[int]], ids) -> np.ndarray:
+    """Boolean (U, U) matrix of a dict-of-sets adjacency, rows/cols in `ids` order."""
+    idx = {u: i for i, u in enumerate(ids)}
+    A = np.zeros((len(ids), len(ids)), dtype=bool)
+    for u, nbrs in adj.items():
+        for v in nbrs:
+            if u in idx and v in idx:
+                A[idx[u], idx[v]] = A[idx[v], idx[u]] = True
+    return A
+
+# ---- Fused surrogate features (one distance matrix per snapshot) ----
+
+def mst_bottleneck(D: np.ndarray) -> np.ndarray:
+    """Longest MST edge for distance matrices D (..., n, n); Prim's algorithm vectorized over the batch."""
+    D = np.asarray(D, dtype=float)
+    batch, n = D.shape[:-2], D.shape[-1]
+    if n <= 1:
+        return np.zeros(batch)
+    D2 = D.reshape(-1, n, n)
+    rows = np.arange(D2.shape[0])
+    in_tree = np.zeros((D2.shape[0], n), dtype=bool)
+    in_tree[:, 0] = True
+    best = D2[:, 0, :].copy()
+    out = np.zeros(D2.shape[0])
+    for _ in range(n - 1):
+        j = np.argmin(np.where(in_tree, np.inf, best), axis=1)
+        out = np.maximum(out, best[rows, j])
+        in_tree[rows, j] = True
+        best = np.minimum(best, D2[rows, j, :])
+    return out.reshape(batch)
+
+def snapshot_features(positions, cfg) -> np.ndarray:
+    """Surrogate features [MST max edge, average degree, lambda2] of one snapshot (U, 2|3),
+    all derived from a single distance matrix."""
+    D = pairwise_distances(positions)
+    A = adjacency_from_distances(D, cfg)
+    n = A.shape[0]
+    deg = float(A.sum()) / n if n else 0.0
+    return np.array([float(mst_bottleneck(D)), deg, laplacian_lambda2(A)])
+
+def snapshot_features_batch(positions, cfg) -> np.ndarray:
+    """snapshot_features for a (K, U, 2|3) horizon: a (K, 3) feature matrix."""
+    D = pairwise_distances(positions)
+    A = adjacency_from_distances(D, cfg)
+    K, n = A.shape[0], A.shape[-1]
+    F = np.zeros((K, 3))
+    F[:, 0] = mst_bottleneck(D)
+    F[:, 1] = A.sum(axis=(1, 2)) / max(n, 1)
+    F[:, 2] = [laplacian_lambda2(A[k]) for k in range(K)]
+    return F
+
+# ---- Critical-radius fast path ('range' mode) ----
+
+def critical_radius(positions) -> np.ndarray:
+    """Critical radius per snapshot for positions (K, U, 2|3): the MST bottleneck edge.
+    In 'range' mode a snapshot is connected iff critical_radius <= R - rho."""
+    return mst_bottleneck(pairwise_distances(positions))
+
+@dataclass
+class BottleneckProfile:
+    """Critical radius over time for one solution; answers range-mode queries for any (R, rho)."""
+    times: np.ndarray
+    radius: np.ndarray
+
+    @property
+    def critical(self) -> float:
+        return float(self.radius.max()) if len(self.radius) else 0.0
+
+    def margin(self, R: float, rho: float) -> np.ndarray:
+        return max(0.0, R - rho) - self.radius
+
+    def connected(self, R: float, rho: float) -> bool:
+        return self.critical <= max(0.0, R - rho)
+
+    def connected_mask(self, R: float, rho: float) -> np.ndarray:
+        return self.radius <= max(0.0, R - rho)
+
+    def first_violation(self, R: float, rho: float) -> Optional[float]:
+        bad = np.flatnonzero(~self.connected_mask(R, rho))
+        return float(self.times[bad[0]]) if len(bad) else None
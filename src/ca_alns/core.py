@@ -1,10 +1,10 @@
 
 import math, random, time
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, Tuple
 from dataclasses import dataclass
-from .eval import fitness_value, fitness_wrapped, EvalCounter
-from .connectivity import build_snapshot_graph, bfs_connected
-from .config import ExperimentConfig
+from .eval import fitness_value, fitness_wrapped, EvalCounter, BudgetExhausted, make_fitness_cache
+from .config import ExperimentConfig, config_fingerprint
+from .budget import Deadline
 
 @dataclass
 class SAState:
@@ -19,11 +19,17 @@ class CAALNS:
        - Warm-up → final penalties switching
        - Budget-aware fitness with cache
     """
-    def __init__(self, cfg: ExperimentConfig, rng: random.Random):
+    def __init__(self, cfg: ExperimentConfig, rng: random.Random, eval_counter=None, deadline: Deadline = None):
         self.cfg = cfg
         self.rng = rng
-        self.eval_counter = EvalCounter(E_max=cfg.budget.E_max)
-        self.cache: Dict[str, float] = {}
+        # eval_counter: e.g. a budget.WorkerBudget when E_max is shared with other workers
+        self.eval_counter = eval_counter if eval_counter is not None else EvalCounter(E_max=cfg.budget.E_max)
+        # wall-clock budget, started now; pass one with a shared t_end to align several workers
+        self.deadline = deadline if deadline is not None else Deadline(cfg.budget.T_max, cfg.budget.time_check_every)
+        self.cache = make_fitness_cache(cfg.budget)
+        self.store = None   # optional persistent FitnessStore
+        self.best = None    # best candidate of the last run()
+        self.revisits = 0   # candidates answered from the cache in a row
 
     # ------- Rally-point assistance stubs -------
     def _generate_rally_point(self, u_pos, v_pos, R, rho) -> Tuple[float,float]:
@@ -56,6 +62,29 @@ class CAALNS:
             self._sync_rendezvous(sol, len(sol.get('rally_points',[]))-1)
         return sol
 
+    # ------- Operator adaptation hooks (no-ops for the metric-dict skeleton) -------
+    def _credit(self, outcome, evals: int) -> None:
+        """outcome of the latest candidate: 'best', 'better', 'accepted' or None (rejected)."""
+
+    def _end_block(self) -> None:
+        pass
+
+    def _on_block(self, block: int, best: Dict[str, Any], J_best: float):
+        """Called after every block; may return a candidate to adopt (e.g. an island migrant)."""
+        return None
+
+    # ------- Evaluation hooks -------
+    def _evaluate(self, cand: Dict[str, Any], penalties: Dict[str, float]) -> float:
+        # make sure flags exist
+        cand.setdefault('connected', True)
+        cand.setdefault('payload_ok', True)
+        cand.setdefault('battery_ok', True)
+        return fitness_wrapped(fitness_value, self.eval_counter, self.cache, cand, penalties, store=self.store)
+
+    def _complete(self, cand: Dict[str, Any]) -> Dict[str, Any]:
+        """Fill in the metrics of a candidate whose fitness came from the cache (no-op for metric dicts)."""
+        return cand
+
     # ------- Acceptance -------
     def _accept(self, J_new: float, J_cur: float, T: float) -> bool:
         if J_new < J_cur:
@@ -65,6 +94,13 @@ class CAALNS:
         return self.rng.random() < p
 
     # ------- Main run -------
+    def _finish(self, best: Dict[str, Any], J_best: float, stopped_by: str) -> Dict[str, Any]:
+        """stopped_by: 'E_max' or 'T_max'."""
+        # keeps e.g. a Candidate's Solution; the returned dict is plain
+        self.best = best = self._complete(best)
+        return {**best, 'fitness': J_best, 'E_used': self.eval_counter.used,
+                'E_revisits': self.eval_counter.revisits, 'stopped_by': stopped_by, 'wallclock_s': self.deadline.elapsed()}
+
     def run(self, initial_solution: Dict[str, Any], penalties_final: Dict[str,float]) -> Dict[str, Any]:
         # Initialize SA
         T0 = max(1e-6, self.cfg.operators.T0_scale * max(1.0, initial_solution.get('mean_insert_cost', 10.0)))
@@ -78,58 +114,140 @@ class CAALNS:
 
         cur = initial_solution.copy()
         best = cur.copy()
-        J_cur = fitness_wrapped(fitness_value, self.eval_counter, self.cache, cur, penalties)
+        try:
+            J_cur = self._evaluate(cur, penalties)
+        except BudgetExhausted:   # shared budget already spent by other workers
+            return self._finish(best, None, 'E_max')
         J_best = J_cur
 
-        w1,w2,w3 = self.cfg.operators.weights_w1, self.cfg.operators.weights_w2, self.cfg.operators.weights_w3
         block = 0; blocks_warm = self.cfg.operators.warm_blocks
+        # consecutive candidates answered from the cache: repair noise grows with it, and beyond
+        # free_revisits each further one is charged to E_max (as a revisit, not in E_used), so the
+        # run still ends
+        self.revisits = 0
 
         while True:
-            # Budget/time checked by caller; we just loop by blocks
+            # E_max / T_max are checked after every candidate; the clock is read every time_check_every
             for _ in range(self.cfg.operators.block_len):
                 cand = self._repair(self._destroy(cur))
-                # make sure flags exist
-                cand.setdefault('connected', True)
-                cand.setdefault('payload_ok', True)
-                cand.setdefault('battery_ok', True)
-                J_new = fitness_wrapped(fitness_value, self.eval_counter, self.cache, cand, penalties)
+                used = self.eval_counter.used
+                try:
+                    J_new = self._evaluate(cand, penalties)
+                    self.revisits = self.revisits + 1 if self.eval_counter.used == used else 0
+                    if self.revisits > self.cfg.operators.free_revisits:
+                        self.eval_counter.revisit(1)
+                except BudgetExhausted:   # a shared budget can run dry between checks
+                    return self._finish(best, J_best, 'E_max')
+                outcome = None
                 if self._accept(J_new, J_cur, state.T):
+                    outcome = 'best' if J_new < J_best else ('better' if J_new < J_cur else 'accepted')
                     cur, J_cur = cand, J_new
                     if J_cur < J_best:
-                        best, J_best = cur, J_cur
+                        best, J_best = self._complete(cur), J_cur
+                # only unvisited solutions (not answered by the cache) earn operator score
+                self._credit(outcome if self.revisits == 0 else None, self.eval_counter.used - used)
                 # cooling inside block for simplicity
                 state.T *= state.alpha
-                if self.eval_counter.used >= self.cfg.budget.E_max:
-                    return {**best, 'fitness': J_best, 'E_used': self.eval_counter.used}
+                if self.eval_counter.exhausted():
+                    return self._finish(best, J_best, 'E_max')
+                if self.deadline.expired():
+                    return self._finish(best, J_best, 'T_max')
             block += 1
+            self._end_block()
+            incoming = self._on_block(block, best, J_best)
+            if incoming is not None:
+                try:
+                    J_in = self._evaluate(incoming, penalties)
+                except BudgetExhausted:
+                    return self._finish(best, J_best, 'E_max')
+                if J_in < J_cur:
+                    cur, J_cur = incoming, J_in
+                    if J_cur < J_best:
+                        best, J_best = cur, J_cur
             # switch to final penalties after warm blocks or if feasible best is found
             if block >= blocks_warm or (best.get('connected',False) and best.get('payload_ok',False) and best.get('battery_ok',False)):
                 penalties = dict(penalties_final)
 
 
 
-from .problem import Instance, Solution, build_initial_solution, simulate_snapshots, RouteItem
+from .problem import (Instance, Solution, RouteItem, build_initial_solution, simulate_positions,
+                      iter_snapshot_chunks)
 from .surrogate import FrozenSurrogate
-from .connectivity import build_snapshot_graph, bfs_connected, laplacian_lambda2, avg_degree, mst_max_edge_length, compute_cadence_bound
+from .connectivity import (compute_cadence_bound, build_snapshot_adjacency_batch, bfs_connected_batch,
+                           snapshot_features, snapshot_features_batch, pairwise_distances,
+                           critical_radius, BottleneckProfile)
+from .kinetic import kinetic_connectivity
+from .conncache import ConnectivityCache, edit_start_time
+from .fitness_store import open_fitness_store
+from .moves import RouteEvaluator
+from .adaptive import AdaptiveWeights
+from .operators import default_alns_operators
+from .local_search import LocalSearch
+import numpy as np
+
+class Candidate(dict):
+    """Metric dict that carries its Solution and, for sampled verification, the solution's
+    ConnectivityCache (`conn`), which children re-verify only from their edits on. Cache keys come
+    from `key`, the solution as the operators produced it; metric computation may replace `sol`
+    (local search revert, rally repair) and, on a revert, the key. Candidates from _repair start without
+    metrics (`pending` holds what CAALNSFull._complete needs). Spreading one into a plain dict
+    drops the solution."""
+    def __init__(self, metrics: Dict[str, Any], sol: Solution, key: Solution = None, pending=None,
+                 conn: ConnectivityCache = None):
+        super().__init__(metrics)
+        self.sol = sol
+        self.key = key if key is not None else sol
+        self.pending = pending
+        self.conn = conn
+        self.cacheable = True   # may its fitness be stored under key (see CAALNSFull._complete)
+
+    def copy(self) -> 'Candidate':
+        return Candidate(self, self.sol, self.key, self.pending, self.conn)
+
+    def structural_hash(self) -> int:
+        return self.key.structural_hash()
+
+    def cache_check(self):
+        return self.key.cache_check()
 
 class CAALNSFull(CAALNS):
-    def __init__(self, cfg: ExperimentConfig, rng, instance: Instance, surrogate_path: str = None):
-        super().__init__(cfg, rng)
+    def __init__(self, cfg: ExperimentConfig, rng, instance: Instance, surrogate_path: str = None, eval_counter=None,
+                 deadline: Deadline = None):
+        super().__init__(cfg, rng, eval_counter=eval_counter, deadline=deadline)
         self.instance = instance
         self.surr = FrozenSurrogate.load(surrogate_path) if surrogate_path else None
         self.delta_tau = compute_cadence_bound(cfg.connectivity.R, cfg.connectivity.rho, cfg.connectivity.v_max)
+        self._profiles: Dict[int, BottleneckProfile] = {}
+        # metrics depend on the link model, the steps after a repair (local search, rally repair)
+        # and the surrogate that guides rally repair, so all of them are part of the persistent key
+        ops = cfg.operators
+        evaluation = {'connectivity': config_fingerprint(cfg.connectivity), 'rally': ops.use_rally_points,
+                      'ls': [ops.apply_local_search, ops.ls_k, ops.ls_max_moves],
+                      'surrogate': self.surr.fingerprint() if self.surr else None}
+        self.store = open_fitness_store(cfg.budget, instance.fingerprint() + ':' + config_fingerprint(evaluation))
+        self.destroy_ops, self.repair_ops = default_alns_operators(ops.k_regret, ops.shaw_k)
+        weights = lambda names: AdaptiveWeights(sorted(names), ops.weights_w1, ops.weights_w2, ops.weights_w3,
+                                                reaction=ops.reaction, reward_mode=ops.reward_mode)
+        self.destroy_weights, self.repair_weights = weights(self.destroy_ops), weights(self.repair_ops)
+        self.last_ops = (None, None)   # (destroy, repair) names of the latest candidate
+        self._op_time = (0.0, 0.0)     # their wall times
+        self.local_search = LocalSearch(instance, k=ops.ls_k, max_moves=ops.ls_max_moves,
+                                        v_default=cfg.connectivity.v_max) if ops.apply_local_search else None
+        self.ls_reverted = 0           # local search results dropped by the connectivity check
 
-    def _compute_solution_metrics(self, sol: Solution):
-        total = sol.total_travel()
-        W_max, W_min = sol.workload_extrema()
-        snaps = simulate_snapshots(sol, self.instance, self.delta_tau, v_default=self.cfg.connectivity.v_max)
-        all_connected = True
-        for tk, pos in snaps.items():
-            pos3 = {u_id: (xy[0], xy[1], 0.0) for u_id, xy in pos.items()}
-            adj = build_snapshot_graph(pos3, self.cfg.connectivity)
-            if not bfs_connected(adj):
-                all_connected = False
-                break
+    def _compute_solution_metrics(self, sol: Solution, conn_cache: ConnectivityCache = None):
+        total = sol.total_travel(self.instance)
+        W_max, W_min = sol.workload_extrema(self.instance)
+        conn = self.cfg.connectivity
+        extra = {}
+        if conn.verification == "kinetic":
+            rep = kinetic_connectivity(sol, self.instance, conn)
+            all_connected = rep.connected
+            extra = {'connected_time_frac': rep.connected_fraction, 'first_disconnect_t': rep.first_disconnect_t}
+        elif conn_cache is not None:
+            all_connected = conn_cache.connected
+        else:
+            all_connected = self._sampled_connected(sol)
         return {
             'total_travel': total,
             'workload_max': W_max,
@@ -137,59 +255,262 @@ class CAALNSFull(CAALNS):
             'connected': all_connected,
             'payload_ok': True,
             'battery_ok': True,
-            'makespan': sol.makespan(self.instance.uavs, v_default=self.cfg.connectivity.v_max)
+            'makespan': sol.makespan(self.instance.uavs, v_default=self.cfg.connectivity.v_max, inst=self.instance),
+            'rally_points_count': sum(it.kind == 'rp' for route in sol.routes.values() for it in route) // 2,
+            'rally_wait_sum': sum(it.wait for route in sol.routes.values() for it in route if it.kind == 'rp'),
+            **extra
         }
 
+    def _sampled_connected(self, sol: Solution) -> bool:
+        conn = self.cfg.connectivity
+        all_connected = True
+        # stop at the first chunk holding a disconnected snapshot; later chunks are never simulated
+        for _, P in iter_snapshot_chunks(sol, self.instance, self.delta_tau,
+                                         chunk=conn.snapshot_chunk, order=conn.snapshot_order):
+            if conn.mode == "range":
+                ok = critical_radius(P) <= max(0.0, conn.R - conn.rho)
+            else:
+                ok = bfs_connected_batch(build_snapshot_adjacency_batch(P, conn))
+            if not ok.all():
+                all_connected = False
+                break
+        return all_connected
+
+    def bottleneck_profile(self, sol: Solution, sim=None) -> BottleneckProfile:
+        """Critical radius over the whole horizon, cached per route layout.
+        sim: optional (times, positions) from simulate_positions to avoid re-simulating."""
+        key = sol.structural_hash()
+        prof = self._profiles.get(key)
+        if prof is None:
+            times, P = sim if sim is not None else simulate_positions(sol, self.instance, self.delta_tau)
+            prof = BottleneckProfile(times, critical_radius(P))
+            if len(self._profiles) >= 256:
+                self._profiles.clear()
+            self._profiles[key] = prof
+        return prof
+
     def _surrogate_snapshot_risk(self, positions: dict):
         if not self.surr:
             return 0.0, False
-        pos2 = {u:(p[0],p[1]) for u,p in positions.items()}
-        adj = build_snapshot_graph({u:(p[0],p[1],0.0) for u,p in positions.items()}, self.cfg.connectivity)
-        feats = [mst_max_edge_length(pos2), avg_degree(adj), laplacian_lambda2(adj)]
+        P = np.array([(p[0], p[1]) for p in positions.values()], dtype=float).reshape(-1, 2)
+        feats = snapshot_features(P, self.cfg.connectivity)
         s = self.surr.score(feats)
         return s, self.surr.is_borderline(s)
 
-    def _attempt_rally_repair(self, sol: Solution) -> Solution:
-        snaps = simulate_snapshots(sol, self.instance, self.delta_tau, v_default=self.cfg.connectivity.v_max)
-        for tk, pos in snaps.items():
-            s, borderline = self._surrogate_snapshot_risk({u:(xy[0],xy[1],0.0) for u,xy in pos.items()})
-            adj = build_snapshot_graph({u:(xy[0],xy[1],0.0) for u,xy in pos.items()}, self.cfg.connectivity)
-            connected = bfs_connected(adj)
-            if connected and not borderline and (not self.surr or s < self.surr.tau):
-                continue
-            ids = list(pos.keys())
-            if len(ids) < 2:
-                continue
-            maxd = -1.0; pair = None
-            import math
-            for i in range(len(ids)):
-                for j in range(i+1, len(ids)):
-                    u,v = ids[i], ids[j]
-                    ax,ay = pos[u]; bx,by = pos[v]
-                    d = math.hypot(ax-bx, ay-by)
-                    if d > maxd:
-                        maxd = d; pair = (u,v, (0.5*(ax+bx), 0.5*(ay+by)))
-            if pair:
-                u, v, rp = pair
-                for uid in (u,v):
-                    route = sol.routes[uid]
-                    depot_idx = len(route)-1
-                    route.insert(depot_idx, RouteItem('rp', -1, rp[0], rp[1], wait=0.0))
-                for uid in (u,v):
-                    route = sol.routes[uid]
-                    for it in route:
-                        if it.kind == 'rp' and it.x==rp[0] and it.y==rp[1]:
-                            it.wait = max(it.wait, 5.0)
-                break
+    def _attempt_rally_repair(self, sol: Solution, conn_cache: ConnectivityCache = None) -> Solution:
+        """Insert one rally point for the farthest UAV pair at the first risky or disconnected snapshot.
+        With conn_cache, its samples and verdicts are reused and it is re-verified only from the edit on."""
+        conn = self.cfg.connectivity
+        if conn_cache is not None:
+            times, P = conn_cache.times, conn_cache.P
+        else:
+            times, P = simulate_positions(sol, self.instance, self.delta_tau)
+        K, U = P.shape[0], P.shape[1]
+        if U < 2:
+            return sol
+        flagged = np.zeros(K, dtype=bool)
+        if self.surr:
+            feats = snapshot_features_batch(P, conn)
+            risky, borderline = self.surr.risk_masks(self.surr.score_batch(feats))
+            flagged = risky | borderline
+        # flagged snapshots are repaired regardless, so the exact check only runs before the first one
+        r = int(np.argmax(flagged)) if flagged.any() else K
+        if conn_cache is not None:
+            ok = conn_cache.ok[:r]
+        elif conn.mode == "range":
+            ok = self.bottleneck_profile(sol, sim=(times, P)).connected_mask(conn.R, conn.rho)[:r]
+        else:
+            ok = bfs_connected_batch(build_snapshot_adjacency_batch(P[:r], conn))
+        bad = np.flatnonzero(~ok)
+        k = int(bad[0]) if len(bad) else (r if r < K else None)
+        if k is None:
+            return sol
+        D = pairwise_distances(P[k])
+        D = np.where(np.triu(np.ones_like(D, dtype=bool), 1), D, -1.0)
+        i, j = np.unravel_index(int(np.argmax(D)), D.shape)
+        u, v = self.instance.uavs[i].id, self.instance.uavs[j].id
+        rp = (0.5*(P[k, i, 0] + P[k, j, 0]), 0.5*(P[k, i, 1] + P[k, j, 1]))
+        v_of = {a.id: a.v_max for a in self.instance.uavs}
+        edits = {uid: edit_start_time(sol.routes[uid], len(sol.routes[uid])-1, v_of[uid]) for uid in (u,v)}
+        for uid in (u,v):
+            depot_idx = len(sol.routes[uid])-1
+            sol.insert_item(uid, depot_idx, RouteItem('rp', -1, rp[0], rp[1], wait=0.0))
+        for uid in (u,v):
+            for idx, it in enumerate(sol.routes[uid]):
+                if it.kind == 'rp' and it.x==rp[0] and it.y==rp[1]:
+                    sol.set_wait(uid, idx, max(it.wait, 5.0))
+        if conn_cache is not None:
+            conn_cache.update(sol, edits)
         return sol
 
+    # ------- destroy / repair over the candidate's Solution -------
+    def _destroy(self, cur: 'Candidate'):
+        """Copy the solution, drop its rally points (repair re-creates the ones still needed)
+        and remove q targets with a random destroy operator."""
+        sol = cur.sol.copy()
+        for uid, route in sol.routes.items():
+            for pos in range(len(route) - 1, -1, -1):
+                if route[pos].kind == 'rp':
+                    sol.remove_item(uid, pos)
+        t0 = time.perf_counter()
+        ev = RouteEvaluator(sol, self.instance, v_default=self.cfg.connectivity.v_max)
+        ops = self.cfg.operators
+        n = len(self.instance.targets)
+        q = self.rng.randint(min(ops.q_min, n), max(min(ops.q_min, n), int(ops.q_max_frac * n)))
+        name = self.destroy_weights.select(self.rng)
+        removed = self.destroy_ops[name](ev, self.rng, q, self.instance)
+        return ev, removed, name, time.perf_counter() - t0, cur
+
+    def _repair(self, partial_state) -> 'Candidate':
+        """Re-insert the removed targets (then run local search if enabled). Metrics are left to
+        _complete, which runs only if the candidate misses the fitness cache."""
+        ev, removed, d_name, d_time, parent = partial_state
+        base = parent.sol
+        t0 = time.perf_counter()
+        r_name = self.repair_weights.select(self.rng)
+        # after a revisit the same partial solution would be repaired the same way: add noise
+        noise = min(1.0, self.cfg.operators.revisit_noise * self.revisits)
+        self.repair_ops[r_name](ev, removed, self.rng, noise=noise)
+        sol = ev.sol
+        pre = None
+        if self.local_search is not None:
+            pre = sol.copy()
+            # the incumbent went through local search already: rescan only around the edit
+            wake = LocalSearch.changed_targets(base, sol)
+            if not self.local_search.run(sol, ev, wake=wake, deadline=self.deadline).n_moves:
+                pre = None
+        self.last_ops, self._op_time = (d_name, r_name), (d_time, time.perf_counter() - t0)
+        return Candidate({}, sol, pending=(pre, base, parent.conn))
+
+    def _evaluate(self, cand: 'Candidate', penalties: Dict[str, float]) -> float:
+        """fitness_wrapped, except that the cache write waits for _complete to settle the key: a
+        reverted local search stores under the solution it reverted to, and a result that depends on
+        the pre-search solution is not stored at all."""
+        h, check = cand.structural_hash(), cand.cache_check()
+        J = self.cache.get(h, check=check)
+        if J is not None:
+            return J
+        if self.store is not None:
+            J = self.store.get(cand, penalties)
+            if J is not None:
+                if self.store.charge_hits:
+                    self.eval_counter.tick(1)
+                self.cache.put(h, J, check)
+                return J
+        self.eval_counter.tick(1)
+        J = self._fitness(cand, penalties)
+        if cand.cacheable:
+            self.cache.put(cand.structural_hash(), J, cand.cache_check())
+            if self.store is not None:
+                self.store.put(cand, penalties, J)
+        return J
+
+    def _fitness(self, cand: 'Candidate', penalties: Dict[str, float]) -> float:
+        # cache miss: the evaluation is charged, now compute the metrics; the repair operator
+        # is charged for this time too
+        t0 = time.perf_counter()
+        self._complete(cand)
+        d_time, r_time = self._op_time
+        self._op_time = (d_time, r_time + time.perf_counter() - t0)
+        return fitness_value(cand, penalties)
+
+    def _complete(self, cand: 'Candidate') -> 'Candidate':
+        """Metrics of a repaired candidate: connectivity check, revert of a local search that broke
+        connectivity, rally repair. The result must be a function of cand.key for the cache to be
+        valid. Without local search it is. With it, a connected search result is; a reverted one is
+        re-keyed on the connected solution it reverted to; a disconnected one also depended on the
+        pre-search solution, so it is marked not cacheable."""
+        if cand.pending is None:
+            return cand
+        (pre, base, base_conn), cand.pending = cand.pending, None
+        sol = cand.sol
+        conn = self._child_conn(sol, base, base_conn)
+        metrics = self._compute_solution_metrics(sol, conn_cache=conn)
+        if pre is not None and not metrics['connected']:
+            # local search ignores connectivity: keep the repaired solution if it was connected
+            pre_conn = self._child_conn(pre, base, base_conn)
+            pre_metrics = self._compute_solution_metrics(pre, conn_cache=pre_conn)
+            if pre_metrics['connected']:
+                sol, conn, metrics = pre, pre_conn, pre_metrics
+                cand.key = pre
+                self.ls_reverted += 1
+        cand.cacheable = self.local_search is None or metrics['connected']
+        if self.cfg.operators.use_rally_points and not metrics['connected']:
+            sol = self._attempt_rally_repair(sol.copy(), conn_cache=conn)   # the key solution stays as repaired
+            metrics = self._compute_solution_metrics(sol, conn_cache=conn)
+        cand.sol, cand.conn = sol, conn
+        cand.update(metrics)
+        return cand
+
+    def _child_conn(self, sol: Solution, base: Solution, base_conn: ConnectivityCache):
+        """ConnectivityCache of sol, derived from that of base: each route is re-sampled and
+        re-verified from the time its UAV departs the item before its first changed position.
+        None under kinetic verification."""
+        if self.cfg.connectivity.verification == "kinetic":
+            return None
+        if base_conn is None:
+            return ConnectivityCache(sol, self.instance, self.cfg.connectivity, self.delta_tau)
+        edits = {}
+        for u in self.instance.uavs:
+            old, new = base.routes[u.id], sol.routes[u.id]
+            if old == new:
+                continue
+            p = next((i for i, (a, b) in enumerate(zip(old, new)) if a != b), min(len(old), len(new)))
+            edits[u.id] = edit_start_time(new, p, u.v_max)
+        conn = base_conn.copy()
+        conn.update(sol, edits)
+        return conn
+
+    def _credit(self, outcome, evals: int) -> None:
+        (d_name, r_name), (d_time, r_time) = self.last_ops, self._op_time
+        self.destroy_weights.record(d_name, outcome, d_time, evals)
+        self.repair_weights.record(r_name, outcome, r_time, evals)
+
+    def _end_block(self) -> None:
+        self.destroy_weights.end_block()
+        self.repair_weights.end_block()
+
+    def _finish(self, best: 'Candidate', J_best: float, stopped_by: str) -> Dict[str, Any]:
+        # the reported solution itself, e.g. for experiments.run_sweep --from_runs
+        return {**super()._finish(best, J_best, stopped_by), 'routes': self.best.sol.to_json()}
+
+    def operator_stats(self) -> Dict[str, Any]:
+        out = {'reward_mode': self.cfg.operators.reward_mode,
+               'destroy': self.destroy_weights.stats(), 'repair': self.repair_weights.stats()}
+        if self.local_search is not None:
+            out['local_search'] = {**self.local_search.stats(), 'reverted': self.ls_reverted}
+        return out
+
+    def _mean_insert_cost(self, sol: Solution) -> float:
+        ev = RouteEvaluator(sol, self.instance, v_default=self.cfg.connectivity.v_max)
+        sav = np.concatenate([ev.removal_savings(uid) for uid in ev.uids] or [np.zeros(0)])
+        return float(sav.mean()) if len(sav) else 10.0
+
     def run_full(self, penalties_final, surrogate_path: str = None):
         sol = build_initial_solution(self.instance)
-        init_metrics = self._compute_solution_metrics(sol)
-        init_metrics['mean_insert_cost'] = 10.0
-        res = super().run(initial_solution=init_metrics, penalties_final=penalties_final)
-        if not res.get('connected', True):
-            sol2 = self._attempt_rally_repair(sol)
-            metrics2 = self._compute_solution_metrics(sol2)
-            return {**metrics2, 'E_used': self.eval_counter.used, 'fitness': None}
-        return {**init_metrics, 'E_used': self.eval_counter.used}
+        cache = self._child_conn(sol, sol, None)
+        metrics = self._compute_solution_metrics(sol, conn_cache=cache)
+        if self.local_search is not None:
+            # repairs rescan only around their edit, so the search should start from a local optimum;
+            # as after every repair, it is dropped if it disconnects a connected solution
+            improved = sol.copy()
+            if self.local_search.run(improved, deadline=self.deadline).n_moves:
+                ls_cache = self._child_conn(improved, sol, cache)
+                ls_metrics = self._compute_solution_metrics(improved, conn_cache=ls_cache)
+                if ls_metrics['connected'] or not metrics['connected']:
+                    sol, cache, metrics = improved, ls_cache, ls_metrics
+                else:
+                    self.ls_reverted += 1
+        init = Candidate(metrics, sol, conn=cache)
+        init['mean_insert_cost'] = self._mean_insert_cost(sol)
+        res = super().run(initial_solution=init, penalties_final=penalties_final)
+        # a last rally repair for a disconnected best, unless T_max has passed (the check is slow)
+        if not res.get('connected', True) and not self.deadline.expired(now=True):
+            sol2 = self.best.sol.copy()
+            cache2 = self._child_conn(sol2, self.best.sol, self.best.conn)
+            sol2 = self._attempt_rally_repair(sol2, conn_cache=cache2)
+            metrics2 = self._compute_solution_metrics(sol2, conn_cache=cache2)
+            return {**metrics2, 'E_used': self.eval_counter.used, 'E_revisits': self.eval_counter.revisits,
+                    'fitness': None, 'routes': sol2.to_json(),
+                    'stopped_by': res['stopped_by'], 'wallclock_s': self.deadline.elapsed()}
+        return res
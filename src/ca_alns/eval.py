@@ -1,21 +1,42 @@
 
 from dataclasses import dataclass
-from typing import Optional, Dict, Any, Tuple
+from typing import Optional, Dict, Any, List, Tuple
 import math
 import hashlib
 import json
+import sys
+from collections import OrderedDict
+import numpy as np
+
+class BudgetExhausted(RuntimeError):
+    """Raised by tick()/revisit() when the evaluation budget cannot cover the request."""
 
 @dataclass
 class EvalCounter:
+    """used: fitness evaluations run; revisits: cache hits charged by the search (see
+    OperatorConfig.free_revisits). Both count against E_max."""
     E_max: int
     used: int = 0
+    revisits: int = 0
 
     def tick(self, n: int = 1):
         self.used += n
-        if self.used > self.E_max:
-            raise RuntimeError(f"Evaluation budget exceeded: used={self.used} > E_max={self.E_max}")
+        self._check()
+
+    def revisit(self, n: int = 1):
+        self.revisits += n
+        self._check()
+
+    def _check(self):
+        if self.used + self.revisits > self.E_max:
+            raise BudgetExhausted(f"Evaluation budget exceeded: used={self.used} + revisits={self.revisits} "
+                                  f"> E_max={self.E_max}")
+
+    def exhausted(self) -> bool:
+        return self.used + self.revisits >= self.E_max
 
 def hash_solution(sol: Dict[str, Any]) -> str:
+    """Stable JSON + SHA-256 digest (slow; kept as the 'json' hashing scheme)."""
     # A generic, order-independent hash for caching
     def freeze(x):
         if isinstance(x, dict):
@@ -27,21 +48,136 @@ def hash_solution(sol: Dict[str, Any]) -> str:
     payload = json.dumps(freeze(sol), sort_keys=True, separators=(',',':'))
     return hashlib.sha256(payload.encode('utf-8')).hexdigest()
 
-def compute_upper_bounds(coords, depot_idx: int, n_uav: int, alpha: float) -> float:
+_MASK64 = (1 << 64) - 1
+
+def _fast_freeze(x):
+    if isinstance(x, dict):
+        return tuple(sorted((k, _fast_freeze(v)) for k, v in x.items()))
+    if isinstance(x, (list, tuple)):
+        return tuple(_fast_freeze(v) for v in x)
+    return x
+
+def fast_hash(sol) -> int:
+    """Default cache key: the structural (Zobrist) hash for route-based solutions,
+    otherwise the built-in hash of a frozen metric dict. In-process keys only."""
+    structural = getattr(sol, 'structural_hash', None)
+    if structural is not None:
+        return structural()
+    return hash(_fast_freeze(sol)) & _MASK64
+
+def stable_hash(sol) -> int:
+    """Like fast_hash but identical across processes and runs (usable as a persistent key)."""
+    structural = getattr(sol, 'structural_hash', None)
+    if structural is not None:
+        return structural()
+    digest = hashlib.blake2b(repr(_fast_freeze(sol)).encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little')
+
+def cache_check(sol):
+    """Verification value stored next to a cache entry (Solution.cache_check() for route-based
+    solutions, else None): a hit whose stored value differs is a key collision and counts as a miss."""
+    check = getattr(sol, 'cache_check', None)
+    return check() if check is not None else None
+
+def penalty_fingerprint(penalties: Dict[str, Any]) -> str:
+    payload = json.dumps(penalties, sort_keys=True, separators=(',',':'), default=str)
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
+
+HASH_SCHEMES = {'json': hash_solution, 'fast': fast_hash, 'stable': stable_hash}
+
+# ---- bounded fitness cache ----
+_ENTRY_OVERHEAD = 100   # approx. bytes of OrderedDict bookkeeping per entry (links + hash slot)
+
+class FitnessCache:
+    """Bounded LRU map from solution hash to fitness.
+    max_entries / max_bytes: eviction thresholds (None = unbounded); bytes are an estimate from
+    sys.getsizeof of key and value plus a fixed per-entry overhead.
+    Entries may carry a verification value (put(..., check=)); get(..., check=) with a different
+    one is a hash collision: it is counted and answered as a miss."""
+    def __init__(self, max_entries: Optional[int] = None, max_bytes: Optional[int] = None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._data: OrderedDict = OrderedDict()   # key -> (value, check)
+        self.nbytes = 0
+        self.hits = self.misses = self.evictions = self.collisions = 0
+
+    @staticmethod
+    def _size(key, entry) -> int:
+        return sys.getsizeof(key) + sys.getsizeof(entry[0]) + sys.getsizeof(entry[1]) + _ENTRY_OVERHEAD
+
+    def get(self, key, default=None, check=None):
+        entry = self._data.get(key)
+        if entry is not None and check is not None and entry[1] is not None and entry[1] != check:
+            self.collisions += 1
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key, value, check=None):
+        old = self._data.pop(key, None)
+        if old is not None:
+            self.nbytes -= self._size(key, old)
+        entry = (value, check)
+        self._data[key] = entry
+        self.nbytes += self._size(key, entry)
+        while self._data and ((self.max_entries is not None and len(self._data) > self.max_entries)
+                              or (self.max_bytes is not None and self.nbytes > self.max_bytes)):
+            k, e = self._data.popitem(last=False)
+            self.nbytes -= self._size(k, e)
+            self.evictions += 1
+
+    def __setitem__(self, key, value):
+        self.put(key, value)
+
+    def __getitem__(self, key):
+        return self._data[key][0]
+
+    def __contains__(self, key) -> bool:
+        return key in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def clear(self):
+        self._data.clear()
+        self.nbytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {'entries': len(self._data), 'bytes': self.nbytes,
+                'max_entries': self.max_entries, 'max_bytes': self.max_bytes,
+                'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                'collisions': self.collisions, 'hit_rate': self.hits / lookups if lookups else 0.0}
+
+def make_fitness_cache(budget) -> FitnessCache:
+    """FitnessCache sized from a BudgetConfig (cache_size / cache_bytes; 0 or None = unbounded)."""
+    return FitnessCache(max_entries=getattr(budget, 'cache_size', None) or None,
+                        max_bytes=getattr(budget, 'cache_bytes', None) or None)
+
+def compute_upper_bounds(coords, depot_idx: int, n_uav: int, alpha: float, D=None) -> float:
     """Compute C_max^{aug} rough upper bound using MST-like star proxy.
     coords: list of (x,y) for depot+targets
     depot_idx: index of depot in coords
     n_uav: number of UAVs
     alpha: travel cost weight
+    D: optional precomputed distance matrix over coords (e.g. Instance.distance_matrix())
     Returns C_max^{aug}.
     """
     # depot-star sum
     import math
     def dist(a,b):
         return math.hypot(a[0]-b[0], a[1]-b[1])
-    v0 = coords[depot_idx]
-    W_star = sum(dist(v0, coords[j]) for j in range(len(coords)) if j != depot_idx)
-    R_max = max((dist(v0, coords[j]) for j in range(len(coords)) if j != depot_idx), default=0.0)
+    if D is not None:
+        star = [float(D[depot_idx][j]) for j in range(len(coords)) if j != depot_idx]
+    else:
+        v0 = coords[depot_idx]
+        star = [dist(v0, coords[j]) for j in range(len(coords)) if j != depot_idx]
+    W_star = sum(star)
+    R_max = max(star, default=0.0)
     # crude MST upper bound proxy:  use star as proxy if MST not available
     C_travel = alpha * min(n_uav * 2.0 * W_star, (2.0*W_star + 2.0*n_uav*R_max))
     # workload imbalance bound requires B_max; caller can add if desired
@@ -88,15 +224,31 @@ def fitness_value(solution: Dict[str, Any], penalties: Dict[str, float]) -> floa
         J += lam_mksp
     return J
 
-def fitness_wrapped(fitness_fn, eval_counter: EvalCounter, cache: Dict[str, float], solution: Dict[str, Any], penalties: Dict[str,float]) -> float:
+def fitness_wrapped(fitness_fn, eval_counter, cache, solution: Dict[str, Any], penalties: Dict[str,float],
+                    hash_fn=fast_hash, store=None) -> float:
     """Cache-aware budget-compliant fitness wrapper.
+    eval_counter: EvalCounter or budget.WorkerBudget (anything with tick()).
+    cache: FitnessCache; entries carry cache_check(solution) to detect hash collisions.
+    hash_fn: cache-key function (see HASH_SCHEMES); defaults to fast_hash.
+    store: optional persistent FitnessStore consulted on in-memory misses; its hits are
+    counted by the store and charged to eval_counter only if store.charge_hits.
     """
-    h = hash_solution(solution)
-    if h in cache:
-        return cache[h]
+    h, check = hash_fn(solution), cache_check(solution)
+    J = cache.get(h, check=check)
+    if J is not None:
+        return J
+    if store is not None:
+        J = store.get(solution, penalties)
+        if J is not None:
+            if store.charge_hits:
+                eval_counter.tick(1)
+            cache.put(h, J, check)
+            return J
     eval_counter.tick(1)
     J = fitness_fn(solution, penalties)
-    cache[h] = J
+    cache.put(h, J, check)
+    if store is not None:
+        store.put(solution, penalties, J)
     return J
 
 # IPkWh metrics (Eq. ipkwh)
@@ -109,3 +261,76 @@ def improvement_abs_per_kwh(J_ref: float, J_alg: float, E_wh: float) -> float:
     if E_wh <= 0: 
         return float('inf') if J_alg < J_ref else 0.0
     return (J_ref - J_alg) / (E_wh / 1000.0)
+
+# ---- batch evaluation (struct-of-arrays) ----
+METRIC_FIELDS = ('total_travel', 'connected', 'payload_ok', 'battery_ok', 'workload_max', 'workload_min',
+                 'rally_points_count', 'rally_wait_sum', 'makespan')
+
+def metrics_soa(solutions: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    """Stack metric dicts into arrays, with fitness_value's defaults for missing keys."""
+    tt = np.array([float(s.get('total_travel', 0.0)) for s in solutions])
+    return {
+        'total_travel': tt,
+        'connected': np.array([bool(s.get('connected', True)) for s in solutions], dtype=bool),
+        'payload_ok': np.array([bool(s.get('payload_ok', True)) for s in solutions], dtype=bool),
+        'battery_ok': np.array([bool(s.get('battery_ok', True)) for s in solutions], dtype=bool),
+        'workload_max': np.array([float(s.get('workload_max', t)) for s, t in zip(solutions, tt)]),
+        'workload_min': np.array([float(s.get('workload_min', 0.0)) for s in solutions]),
+        'rally_points_count': np.array([int(s.get('rally_points_count', 0)) for s in solutions]),
+        'rally_wait_sum': np.array([float(s.get('rally_wait_sum', 0.0)) for s in solutions]),
+        'makespan': np.array([float(s.get('makespan', 0.0)) for s in solutions]),
+    }
+
+def fitness_batch(metrics: Dict[str, np.ndarray], penalties: Dict[str, float]) -> np.ndarray:
+    """fitness_value over N candidates at once. metrics: struct-of-arrays keyed by METRIC_FIELDS
+    (missing fields take fitness_value's defaults). Terms are added in the same order, so the
+    result matches fitness_value element-wise."""
+    n = max((np.size(v) for v in metrics.values()), default=0)
+    get = lambda k, d, dt=float: np.broadcast_to(np.asarray(metrics.get(k, d), dtype=dt), (n,))
+    tt = get('total_travel', 0.0)
+    H_max = penalties.get('H_max', None)
+    J = penalties.get('alpha', 1.0) * tt
+    J = J + np.where(get('connected', True, bool), 0.0, penalties.get('lambda_disc', 0.0))
+    J = J + np.where(get('payload_ok', True, bool), 0.0, penalties.get('lambda_cap', 0.0))
+    J = J + np.where(get('battery_ok', True, bool), 0.0, penalties.get('lambda_bat', 0.0))
+    W_max = get('workload_max', 0.0) if 'workload_max' in metrics else tt
+    J = J + penalties.get('lambda_bal', 0.0) * np.maximum(0.0, W_max - get('workload_min', 0.0))
+    J = J + penalties.get('lambda_wait', 0.0) * np.maximum(0.0, get('rally_wait_sum', 0.0))
+    J = J + penalties.get('lambda_rp', 0.0) * np.maximum(0, get('rally_points_count', 0, int))
+    if H_max is not None:
+        J = J + np.where(get('makespan', 0.0) > H_max, penalties.get('lambda_mksp', 0.0), 0.0)
+    return J
+
+def fitness_batch_wrapped(eval_counter, cache, solutions: List[Dict[str, Any]], penalties: Dict[str, float],
+                          hash_fn=fast_hash, store=None) -> np.ndarray:
+    """Batch counterpart of fitness_wrapped: cached candidates are looked up, the rest are scored
+    by one fitness_batch call and eval_counter is ticked by their number. Duplicates within the
+    batch are evaluated (and charged) once, as sequential calls would be."""
+    out = np.empty(len(solutions))
+    todo: Dict[Any, List[int]] = {}
+    for i, sol in enumerate(solutions):
+        h, check = hash_fn(sol), cache_check(sol)
+        if (h, check) in todo:
+            todo[h, check].append(i)
+            continue
+        J = cache.get(h, check=check)
+        if J is None and store is not None:
+            J = store.get(sol, penalties)
+            if J is not None:
+                if store.charge_hits:
+                    eval_counter.tick(1)
+                cache.put(h, J, check)
+        if J is None:
+            todo[h, check] = [i]
+        else:
+            out[i] = J
+    if todo:
+        eval_counter.tick(len(todo))
+        first = [idx[0] for idx in todo.values()]
+        vals = fitness_batch(metrics_soa([solutions[i] for i in first]), penalties)
+        for ((h, check), idx), J in zip(todo.items(), vals.tolist()):
+            out[idx] = J
+            cache.put(h, J, check)
+            if store is not None:
+                store.put(solutions[idx[0]], penalties, J)
+    return out
@@ -0,0 +1,90 @@
+"""Persistent cross-run fitness cache (SQLite).
+
+Rows are keyed by (instance fingerprint, penalty fingerprint, stable solution hash). The instance
+fingerprint is the caller's namespace: it must cover everything the fitness depends on besides the
+solution and penalties (CAALNSFull adds the link model, local search and rally settings and the
+surrogate), so only runs that evaluate the same way share rows, e.g. seeds of one variant. Each
+row also keeps the solution's cache_check(); a row whose check differs is a hash collision and is
+treated as a miss. Hits are always counted; whether they are charged to the evaluation budget is
+the caller's choice (charge_hits), keeping E_max accounting explicit in the run JSON.
+"""
+import sqlite3
+from typing import Any, Dict, Optional
+
+from .eval import stable_hash, penalty_fingerprint, cache_check
+
+_SCHEMA = """CREATE TABLE IF NOT EXISTS fitness (
+    instance TEXT NOT NULL, penalties TEXT NOT NULL, solution INTEGER NOT NULL, value REAL NOT NULL, verify TEXT,
+    PRIMARY KEY (instance, penalties, solution)) WITHOUT ROWID"""
+
+def _signed64(h: int) -> int:
+    """SQLite integers are signed 64-bit."""
+    return h - (1 << 64) if h >= (1 << 63) else h
+
+def _check(solution) -> Optional[str]:
+    check = cache_check(solution)
+    return None if check is None else repr(check)
+
+class FitnessStore:
+    def __init__(self, path: str, instance_fp: str, charge_hits: bool = True, flush_every: int = 1000):
+        self.path = path
+        self.instance_fp = instance_fp
+        self.charge_hits = charge_hits
+        self.flush_every = flush_every
+        self._db = sqlite3.connect(path, timeout=60.0)
+        self._db.execute("PRAGMA journal_mode=WAL")   # concurrent grid runs read while one writes
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(_SCHEMA)
+        self._db.commit()
+        self._pen_fp: Dict[tuple, str] = {}
+        self._pending = []
+        self.hits = self.misses = self.writes = self.collisions = 0
+
+    def _penalties(self, penalties: Dict[str, Any]) -> str:
+        key = tuple(sorted((k, str(v)) for k, v in penalties.items()))
+        fp = self._pen_fp.get(key)
+        if fp is None:
+            fp = self._pen_fp[key] = penalty_fingerprint(penalties)
+        return fp
+
+    def get(self, solution, penalties: Dict[str, Any]) -> Optional[float]:
+        row = self._db.execute("SELECT value, verify FROM fitness WHERE instance=? AND penalties=? AND solution=?",
+                               (self.instance_fp, self._penalties(penalties), _signed64(stable_hash(solution)))).fetchone()
+        check = _check(solution)
+        if row is not None and check is not None and row[1] is not None and row[1] != check:
+            self.collisions += 1
+            row = None
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return float(row[0])
+
+    def put(self, solution, penalties: Dict[str, Any], value: float):
+        self._pending.append((self.instance_fp, self._penalties(penalties), _signed64(stable_hash(solution)),
+                              float(value), _check(solution)))
+        if len(self._pending) >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        if self._pending:
+            self._db.executemany("INSERT OR REPLACE INTO fitness VALUES (?,?,?,?,?)", self._pending)
+            self._db.commit()
+            self.writes += len(self._pending)
+            self._pending = []
+
+    def close(self):
+        self.flush()
+        self._db.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {'path': self.path, 'hits': self.hits, 'misses': self.misses,
+                'writes': self.writes + len(self._pending), 'collisions': self.collisions,
+                'charge_hits': self.charge_hits}
+
+def open_fitness_store(budget, instance_fp: str) -> Optional[FitnessStore]:
+    """FitnessStore from BudgetConfig.disk_cache / charge_disk_hits; None when disabled."""
+    path = getattr(budget, 'disk_cache', None)
+    if not path:
+        return None
+    return FitnessStore(path, instance_fp, charge_hits=getattr(budget, 'charge_disk_hits', True))
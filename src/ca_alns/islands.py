@@ -0,0 +1,152 @@
+"""Island-model CA-ALNS: N independent searches in worker processes with elite migration.
+
+Each island runs CAALNSFull with its own RNG stream (SeedSequence.spawn). Every `migrate_every`
+blocks it sends its best solution and operator weights to the next island on a ring and adopts
+the best migrant waiting in its own inbox. A migrant is re-evaluated through the receiving
+island's fitness cache, so an unseen migrant costs one evaluation like any other candidate.
+
+Budgets are global: E_max is one SharedEvalBudget (each island draws evaluations in blocks), and
+T_max is one absolute monotonic deadline shared by all islands.
+"""
+import multiprocessing as mp
+import queue
+import random
+import time
+import traceback
+from typing import Any, Dict, List, Optional
+import numpy as np
+
+from .budget import SharedEvalBudget, Deadline
+from .core import CAALNSFull, Candidate
+from .config import ExperimentConfig
+from .problem import Instance
+
+class IslandALNS(CAALNSFull):
+    def __init__(self, cfg: ExperimentConfig, rng, instance: Instance, surrogate_path: str = None,
+                 eval_counter=None, deadline: Deadline = None, wid: int = 0, inbox=None, outbox=None,
+                 migrate_every: int = 5):
+        super().__init__(cfg, rng, instance, surrogate_path=surrogate_path, eval_counter=eval_counter, deadline=deadline)
+        self.wid = wid
+        self.inbox, self.outbox = inbox, outbox
+        self.migrate_every = max(1, migrate_every)
+        self.sent = self.received = self.adopted = 0
+
+    def _weights(self) -> Dict[str, Dict[str, float]]:
+        return {'destroy': {n: st.weight for n, st in self.destroy_weights.ops.items()},
+                'repair': {n: st.weight for n, st in self.repair_weights.ops.items()}}
+
+    def _blend(self, weights: Dict[str, Dict[str, float]]):
+        for table, aw in (('destroy', self.destroy_weights), ('repair', self.repair_weights)):
+            for n, w in weights.get(table, {}).items():
+                if n in aw.ops:
+                    aw.ops[n].weight = 0.5 * (aw.ops[n].weight + w)
+
+    def _on_block(self, block: int, best, J_best: float):
+        if self.outbox is None or block % self.migrate_every:
+            return None
+        try:
+            self.outbox.put_nowait((self.wid, J_best, dict(best), best.sol, self._weights()))
+            self.sent += 1
+        except queue.Full:
+            pass
+        migrants = []
+        while True:
+            try:
+                migrants.append(self.inbox.get_nowait())
+            except queue.Empty:
+                break
+        if not migrants:
+            return None
+        self.received += len(migrants)
+        _, _, metrics, sol, weights = min(migrants, key=lambda m: m[1])
+        self._blend(weights)
+        self.adopted += 1
+        return Candidate(metrics, sol)
+
+def _island_worker(wid: int, cfg: ExperimentConfig, instance: Instance, surrogate_path: Optional[str],
+                   seed: int, shared: SharedEvalBudget, t_end: Optional[float], inboxes, results, migrate_every: int):
+    budget = shared.worker(wid)
+    n = len(inboxes)
+    inbox, outbox = inboxes[wid], inboxes[(wid + 1) % n]
+    # migrants left unread at shutdown must not block this process's exit
+    outbox.cancel_join_thread()
+    try:
+        solver = IslandALNS(cfg, random.Random(seed), instance, surrogate_path=surrogate_path, eval_counter=budget,
+                            deadline=Deadline(every=cfg.budget.time_check_every, t_end=t_end), wid=wid,
+                            inbox=inbox if n > 1 else None, outbox=outbox if n > 1 else None,
+                            migrate_every=migrate_every)
+        try:
+            res = solver.run_full(penalties_final=cfg.penalties.__dict__, surrogate_path=surrogate_path)
+        finally:
+            budget.release()
+            if solver.store is not None:
+                solver.store.close()
+        res.update(island=wid, cache=solver.cache.stats(), operators=solver.operator_stats(),
+                   migrants_sent=solver.sent, migrants_received=solver.received, migrants_adopted=solver.adopted)
+        results.put(('ok', wid, res))
+    except BaseException:
+        results.put(('error', wid, traceback.format_exc()))
+
+_POLL_S = 1.0   # seconds between liveness checks while waiting for island results
+
+def _rank(res: Dict[str, Any]):
+    J = res.get('fitness')
+    return (J is None, J if J is not None else float('inf'), res.get('total_travel') or float('inf'))
+
+def run_islands(cfg: ExperimentConfig, instance: Instance, n_islands: int, migrate_every: int = 5,
+                surrogate_path: str = None, seed: int = 0, block: int = 64, ctx=None) -> Dict[str, Any]:
+    """Run n_islands CAALNSFull searches under one E_max / T_max; returns the best island's result
+    with per-island summaries under 'islands'. block: evaluations per budget reservation."""
+    ctx = ctx or mp.get_context()
+    start = time.monotonic()
+    t_end = start + cfg.budget.T_max if cfg.budget.T_max else None
+    # small budgets get small blocks so that every island gets a share
+    block = max(1, min(block, cfg.budget.E_max // (8 * n_islands)))
+    shared = SharedEvalBudget(cfg.budget.E_max, n_workers=n_islands, block=block, ctx=ctx)
+    seeds = [int(s.generate_state(1)[0]) for s in np.random.SeedSequence(seed).spawn(n_islands)]
+    inboxes = [ctx.Queue() for _ in range(n_islands)]
+    results = ctx.Queue()
+    procs = [ctx.Process(target=_island_worker, args=(w, cfg, instance, surrogate_path, seeds[w], shared, t_end,
+                                                      inboxes, results, migrate_every), daemon=True)
+             for w in range(n_islands)]
+    for p in procs:
+        p.start()
+    out: List[Dict[str, Any]] = []
+    errors = []
+    pending, suspects = set(range(n_islands)), set()
+    while pending:
+        try:
+            status, wid, payload = results.get(timeout=_POLL_S)
+        except queue.Empty:
+            # a worker killed outright (OOM, signal) never reports; it may also have died holding
+            # the shared budget's lock, so stop the others instead of waiting on them. A worker
+            # counts as dead once it has exited and a further poll still brings no result from it
+            # (a result is flushed to the queue before its worker exits).
+            dead = {w for w in pending if procs[w].exitcode is not None}
+            if dead & suspects:
+                for p in procs:
+                    if p.is_alive():
+                        p.terminate()
+                errors += [f"island {w}: exited with code {procs[w].exitcode} without a result"
+                           for w in sorted(dead & suspects)]
+                break
+            suspects = dead
+            continue
+        pending.discard(wid)
+        if status == 'ok':
+            out.append(payload)
+        else:
+            errors.append(f"island {wid}:\n{payload}")
+    for p in procs:
+        p.join()
+    if errors:
+        raise RuntimeError("Island worker failed\n" + "\n".join(errors))
+    out.sort(key=lambda r: r['island'])
+    best = dict(min(out, key=_rank))
+    best['E_used'] = shared.used
+    best['E_used_per_island'] = shared.per_worker()
+    best['E_revisits'] = shared.revisits
+    best['wallclock_s'] = time.monotonic() - start
+    best['islands'] = [{k: r.get(k) for k in ('island', 'fitness', 'total_travel', 'connected', 'E_used', 'E_revisits',
+                                               'stopped_by', 'migrants_sent', 'migrants_received', 'migrants_adopted')} for r in out]
+    return best
@@ -0,0 +1,91 @@
+"""Event-driven (kinetic) connectivity verification.
+
+UAVs move piecewise-linearly between waypoints, so each pairwise distance crosses the
+link radius only at roots of a quadratic. Connectivity can change only at those roots or at
+waypoint times; checking one point inside every inter-event interval is therefore exact.
+"""
+from dataclasses import dataclass
+from typing import Optional
+import numpy as np
+
+from .connectivity import pairwise_distances, bfs_connected_batch, _sinr_db_matrix
+from .problem import Instance, Solution, uav_timelines, positions_at
+
+@dataclass
+class KineticReport:
+    connected: bool
+    first_disconnect_t: Optional[float]
+    connected_fraction: float
+    horizon: float
+    n_events: int
+
+def link_radius(cfg) -> float:
+    """Distance threshold equivalent to the link rule in cfg.
+    'range': R - rho. 'sinr' (no interference): SINR is monotone in distance, so bisect."""
+    if getattr(cfg, "mode", "range") != "sinr":
+        return max(0.0, getattr(cfg, "R", 150.0) - getattr(cfg, "rho", 15.0))
+    if getattr(cfg, "interference", False):
+        raise ValueError("Kinetic verification needs a distance-threshold link rule; SINR with interference is not one")
+    tx, noise = getattr(cfg, "tx_power_dbm", 20.0), getattr(cfg, "noise_dbm", -96.0)
+    gamma = getattr(cfg, "gamma_th_db", 6.0)
+    ok = lambda d: _sinr_db_matrix(np.array(d), tx, noise) >= gamma
+    if not ok(1.0):
+        return 0.0
+    lo, hi = 1.0, 1e7
+    if ok(hi):
+        return hi
+    for _ in range(100):
+        mid = 0.5*(lo + hi)
+        lo, hi = (mid, hi) if ok(mid) else (lo, mid)
+    return lo
+
+def _crossing_times(B: np.ndarray, X: np.ndarray, r: float) -> np.ndarray:
+    """Absolute times inside each interval [B[m], B[m+1]] where some pair distance equals r.
+    X holds positions (M, U, 2) at the breakpoints B (M,)."""
+    U = X.shape[1]
+    if U < 2 or len(B) < 2:
+        return np.empty(0)
+    span = np.diff(B)
+    live = span > 0
+    B0, span, X0, X1 = B[:-1][live], span[live], X[:-1][live], X[1:][live]
+    iu, ju = np.triu_indices(U, 1)
+    dp = X0[:, iu] - X0[:, ju]
+    dv = ((X1[:, iu] - X1[:, ju]) - dp) / span[:, None, None]
+    a = (dv*dv).sum(-1)
+    b = 2.0*(dp*dv).sum(-1)
+    c = (dp*dp).sum(-1) - r*r
+    disc = b*b - 4.0*a*c
+    ok = (a > 1e-12) & (disc > 0)
+    sq = np.sqrt(np.where(ok, disc, 0.0))
+    a2 = np.where(ok, 2.0*a, 1.0)
+    out = []
+    for s in ((-b - sq)/a2, (-b + sq)/a2):
+        hit = ok & (s > 0) & (s < span[:, None])
+        out.append((B0[:, None] + s)[hit])
+    return np.concatenate(out)
+
+def kinetic_connectivity(sol: Solution, inst: Instance, cfg, chunk: int = 512) -> KineticReport:
+    """Exact connectivity over the whole mission: first disconnection time and connected time fraction."""
+    r = link_radius(cfg)
+    timelines = uav_timelines(sol, inst)
+    if not timelines:
+        return KineticReport(True, None, 1.0, 0.0, 0)
+    B = np.unique(np.concatenate([t for t, _ in timelines]))
+    horizon = float(B[-1])
+    X = np.stack([positions_at(t, pts, B) for t, pts in timelines], axis=1)
+    events = np.unique(np.concatenate([B, _crossing_times(B, X, r)]))
+    if len(events) == 1:
+        probes, lengths = events, np.ones(1)
+    else:
+        probes, lengths = 0.5*(events[:-1] + events[1:]), np.diff(events)
+    ok = np.empty(len(probes), dtype=bool)
+    for s in range(0, len(probes), chunk):
+        tp = probes[s:s+chunk]
+        P = np.stack([positions_at(t, pts, tp) for t, pts in timelines], axis=1)
+        A = pairwise_distances(P) <= r
+        ok[s:s+chunk] = bfs_connected_batch(A)
+    bad = np.flatnonzero(~ok)
+    first = None if len(bad) == 0 else float(events[bad[0]])
+    frac = float(lengths[ok].sum() / lengths.sum()) if lengths.sum() > 0 else float(ok.all())
+    return KineticReport(connected=len(bad) == 0, first_disconnect_t=first,
+                         connected_fraction=frac, horizon=horizon, n_events=len(events))
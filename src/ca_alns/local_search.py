@@ -0,0 +1,177 @@
+"""Neighbour-list local search applied to repaired candidates (alns-ls).
+
+Moves, each anchored at a target a and one of its k nearest targets b (Instance.knn_lists):
+    relocate - move a next to b (before or after it, in any route)
+    or-opt   - move the chain of 2..max_seg targets starting at a next to b
+    swap     - exchange a and b when they sit in different routes
+    2-opt    - reverse the part of a's route between a and b so that a-b becomes a leg
+A pass therefore scores O(n_targets * k) moves instead of O(n_targets^2). Moves are scored with
+RouteEvaluator deltas and the first improving one is applied (first improvement).
+
+Don't-look bits: a target whose neighbourhood gave no improvement is skipped until a move adds
+or removes a leg at it or at one of its neighbours (its moves are scored against their legs). The
+search ends when every bit is set, after max_moves moves or when the caller's Deadline expires.
+Callers that start from a locally optimal solution pass the targets touched by their edit as
+`wake`, so only that neighbourhood is rescanned.
+
+The objective is total travel only; connectivity is left to the caller's final check.
+"""
+from collections import deque
+from dataclasses import dataclass, field
+import time
+from typing import Dict, Iterable, Optional, Set
+
+from .budget import Deadline
+from .moves import RouteEvaluator
+from .problem import Instance, Solution
+
+MOVES = ('relocate', 'or-opt', 'swap', '2-opt')
+
+@dataclass
+class LSResult:
+    moves: Dict[str, int] = field(default_factory=lambda: dict.fromkeys(MOVES, 0))
+    evaluated: int = 0      # move deltas computed
+    d_travel: float = 0.0
+    time_s: float = 0.0
+
+    @property
+    def n_moves(self) -> int:
+        return sum(self.moves.values())
+
+class LocalSearch:
+    def __init__(self, inst: Instance, k: int = 10, max_seg: int = 3, max_moves: int = 1000,
+                 v_default: float = 15.0, eps: float = 1e-9):
+        self.inst = inst
+        self.max_seg = max(1, max_seg)
+        self.max_moves = max_moves
+        self.v = v_default
+        self.eps = eps
+        ids = [t.id for t in inst.targets]
+        self.near = {ids[p]: [ids[q] for q in row] for p, row in enumerate(inst.knn_lists(k).tolist())}
+        # moves anchored at a depend on the legs at its neighbours b too
+        self.near_of = {t: [] for t in ids}
+        for a, row in self.near.items():
+            for b in row:
+                self.near_of[b].append(a)
+        self.totals = LSResult()
+        self.calls = 0
+
+    def run(self, sol: Solution, ev: Optional[RouteEvaluator] = None, wake: Optional[Iterable[int]] = None,
+            deadline: Optional[Deadline] = None) -> LSResult:
+        """Improve sol in place; ev, if given, must be a current RouteEvaluator of sol.
+        wake: targets whose don't-look bits start off (default all), e.g. changed_targets() of an
+        edit applied to a solution that was already locally optimal.
+        deadline: checked before every move (at its own clock-read cadence)."""
+        t0 = time.perf_counter()
+        ev = ev if ev is not None else RouteEvaluator(sol, self.inst, v_default=self.v)
+        res = LSResult()
+        where = {}
+        for uid in ev.uids:
+            self._index(ev, where, uid)
+        queue = deque(sorted(where) if wake is None else sorted(self._wake(wake) & where.keys()))
+        active = set(queue)   # don't-look bit off
+        while queue and res.n_moves < self.max_moves:
+            if deadline is not None and deadline.expired():
+                break
+            a = queue.popleft()
+            active.discard(a)
+            woken = self._improve(ev, where, a, res)
+            for t in self._wake(woken or ()):
+                if t not in active:
+                    active.add(t)
+                    queue.append(t)
+        res.time_s = time.perf_counter() - t0
+        self._add(res)
+        return res
+
+    def stats(self) -> Dict[str, float]:
+        t = self.totals
+        return {'calls': self.calls, 'moves': dict(t.moves), 'evaluated': t.evaluated,
+                'd_travel': t.d_travel, 'time_s': t.time_s}
+
+    @classmethod
+    def changed_targets(cls, old: Solution, new: Solution) -> Set[int]:
+        """Targets at a leg that is in one solution but not the other."""
+        changed = set()
+        for uid, route in new.routes.items():
+            changed |= cls._edges(old.routes.get(uid, [])) ^ cls._edges(route)
+        return cls._targets(changed)
+
+    # ---- internals ----
+    def _wake(self, changed: Set[int]) -> Set[int]:
+        """Targets whose moves a change at `changed` can affect: those and every target listing one
+        of them as a neighbour."""
+        return set(changed).union(*(self.near_of.get(t, ()) for t in changed))
+
+    def _add(self, res: LSResult):
+        self.calls += 1
+        for m, n in res.moves.items():
+            self.totals.moves[m] += n
+        self.totals.evaluated += res.evaluated
+        self.totals.d_travel += res.d_travel
+        self.totals.time_s += res.time_s
+
+    @staticmethod
+    def _index(ev: RouteEvaluator, where, uid: int):
+        for pos, it in enumerate(ev.sol.routes[uid]):
+            if it.kind == 'target':
+                where[it.node_id] = (uid, pos)
+
+    @staticmethod
+    def _edges(route):
+        keys = [(it.kind, it.node_id) for it in route]
+        return {frozenset(e) for e in zip(keys, keys[1:])}
+
+    def _movable(self, route, i: int, L: int) -> bool:
+        return i >= 1 and i + L <= len(route) - 1 and all(it.kind == 'target' for it in route[i:i+L])
+
+    def _improve(self, ev: RouteEvaluator, where, a: int, res: LSResult):
+        """Apply the first improving move around a; returns the targets whose bits it resets, or None."""
+        routes = ev.sol.routes
+        u, i = where[a]
+        for b in self.near.get(a, ()):
+            if b not in where:
+                continue
+            v, j = where[b]
+            for L in range(1, self.max_seg + 1):
+                if not self._movable(routes[u], i, L) or (u == v and i <= j < i + L):
+                    break
+                n_after = len(routes[v]) - (L if u == v else 0)
+                for t in (j, j + 1):        # before b / after b
+                    tj = t - L if u == v and i < j else t
+                    if not 1 <= tj <= n_after - 1 or (u == v and tj == i):
+                        continue
+                    d = ev.relocate_delta(u, i, v, tj) if L == 1 else ev.or_opt_delta(u, i, L, v, tj)
+                    res.evaluated += 1
+                    if d.d_travel < -self.eps:
+                        kind = 'relocate' if L == 1 else 'or-opt'
+                        apply = (lambda: ev.relocate(u, i, v, tj)) if L == 1 else (lambda: ev.or_opt(u, i, L, v, tj))
+                        return self._apply(ev, where, (u, v), apply, kind, d.d_travel, res)
+            if u != v and routes[u][i].kind == routes[v][j].kind == 'target':
+                d = ev.swap_delta(u, i, v, j)
+                res.evaluated += 1
+                if d.d_travel < -self.eps:
+                    return self._apply(ev, where, (u, v), lambda: ev.swap(u, i, v, j), 'swap', d.d_travel, res)
+            if u == v and abs(i - j) > 1:
+                lo, hi = (i + 1, j) if i < j else (j + 1, i)
+                d = ev.two_opt_delta(u, lo, hi)
+                res.evaluated += 1
+                if d.d_travel < -self.eps:
+                    return self._apply(ev, where, (u,), lambda: ev.two_opt(u, lo, hi), '2-opt', d.d_travel, res)
+        return None
+
+    def _apply(self, ev: RouteEvaluator, where, uids, apply, kind: str, d_travel: float, res: LSResult):
+        uids = tuple(dict.fromkeys(uids))
+        before = {uid: self._edges(ev.sol.routes[uid]) for uid in uids}
+        apply()
+        changed = set()
+        for uid in uids:
+            self._index(ev, where, uid)
+            changed |= before[uid] ^ self._edges(ev.sol.routes[uid])
+        res.moves[kind] += 1
+        res.d_travel += d_travel
+        return self._targets(changed)
+
+    @staticmethod
+    def _targets(edges) -> Set[int]:
+        return {nid for e in edges for kind, nid in e if kind == 'target'}
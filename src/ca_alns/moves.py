@@ -0,0 +1,270 @@
+"""Delta evaluation of route edits (insert / remove / relocate / or-opt / swap / 2-opt).
+
+RouteEvaluator caches, per route, the waypoint coordinates, distance-matrix rows, prefix sums of
+leg lengths and wait totals. A move is scored in O(1) from the few legs it touches, and only the
+touched routes are refreshed when a move is applied.
+"""
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+import math
+import numpy as np
+
+from .problem import Instance, Solution, RouteItem
+
+@dataclass
+class MoveDelta:
+    d_travel: float
+    loads: Dict[int, float]      # new workload of every touched route
+    workload_max: float
+    workload_min: float
+    makespan: float
+
+class RouteEvaluator:
+    def __init__(self, sol: Solution, inst: Optional[Instance] = None, v_default: float = 15.0):
+        self.sol = sol
+        self.inst = inst
+        self.v = max(v_default, 1e-6)
+        self.uids = list(sol.routes.keys())
+        self._slot = {u: i for i, u in enumerate(self.uids)}
+        self._D = inst.distance_matrix() if inst is not None else None
+        self.xy: Dict[int, np.ndarray] = {}
+        self.rows: Dict[int, np.ndarray] = {}
+        self.prefix: Dict[int, np.ndarray] = {}
+        self.wait_prefix: Dict[int, np.ndarray] = {}
+        self.loads = np.zeros(len(self.uids))
+        self.waits = np.zeros(len(self.uids))
+        for u in self.uids:
+            self.refresh(u)
+
+    # ---- cache maintenance ----
+    def _row(self, it: RouteItem) -> int:
+        if self.inst is None or it.kind == 'rp':
+            return -1
+        return self.inst.node_index.get(it.node_id, -1)
+
+    def refresh(self, uid: int):
+        route = self.sol.routes[uid]
+        xy = np.array([(it.x, it.y) for it in route], dtype=float).reshape(-1, 2)
+        rows = np.array([self._row(it) for it in route], dtype=int)
+        step = np.diff(xy, axis=0)
+        legs = np.hypot(step[:, 0], step[:, 1])
+        if self._D is not None and len(rows) > 1:
+            known = (rows[:-1] >= 0) & (rows[1:] >= 0)
+            legs[known] = self._D[rows[:-1][known], rows[1:][known]]
+        self.xy[uid], self.rows[uid] = xy, rows
+        self.prefix[uid] = np.concatenate([[0.0], np.cumsum(legs)])
+        self.wait_prefix[uid] = np.concatenate([[0.0], np.cumsum([it.wait for it in route])])
+        self.loads[self._slot[uid]] = self.prefix[uid][-1]
+        self.waits[self._slot[uid]] = self.wait_prefix[uid][-1] - (route[0].wait if route else 0.0)
+
+    # ---- O(1) queries ----
+    def _d(self, ra: int, pa, rb: int, pb) -> float:
+        if self._D is not None and ra >= 0 and rb >= 0:
+            return float(self._D[ra, rb])
+        return math.hypot(pa[0]-pb[0], pa[1]-pb[1])
+
+    def _node(self, uid: int, k: int):
+        return self.rows[uid][k], self.xy[uid][k]
+
+    def _leg(self, uid: int, k: int) -> float:
+        """Length of leg k -> k+1 (0 when either end is outside the route)."""
+        p = self.prefix[uid]
+        return float(p[k+1] - p[k]) if 0 <= k < len(p) - 1 else 0.0
+
+    def _link(self, a, b) -> float:
+        return 0.0 if a is None or b is None else self._d(a[0], a[1], b[0], b[1])
+
+    def _at(self, uid: int, k: int):
+        return self._node(uid, k) if 0 <= k < len(self.rows[uid]) else None
+
+    def item_node(self, it: RouteItem):
+        return (self._row(it), (it.x, it.y))
+
+    def segment_length(self, uid: int, i: int, j: int) -> float:
+        """Distance travelled from item i to item j (i <= j)."""
+        return float(self.prefix[uid][j] - self.prefix[uid][i])
+
+    def arrival_time(self, uid: int, k: int) -> float:
+        """Time at which item k is reached (travel at v_default plus waits of items 1..k-1)."""
+        wp = self.wait_prefix[uid]
+        return float(self.prefix[uid][k] / self.v + (wp[k] - wp[min(1, k)]))
+
+    def _delta(self, changes: Dict[int, Tuple[float, float]]) -> MoveDelta:
+        loads = self.loads.copy(); waits = self.waits.copy()
+        d_travel = 0.0
+        for uid, (dl, dw) in changes.items():
+            s = self._slot[uid]
+            loads[s] += dl; waits[s] += dw
+            d_travel += dl
+        return MoveDelta(d_travel=d_travel,
+                         loads={u: float(loads[self._slot[u]]) for u in changes},
+                         workload_max=float(loads.max()) if len(loads) else 0.0,
+                         workload_min=float(loads.min()) if len(loads) else 0.0,
+                         makespan=float(max(0.0, (loads / self.v + waits).max())) if len(loads) else 0.0)
+
+    def _dw(self, uid: int, total: float, new_first: Optional[RouteItem]) -> float:
+        """Change of counted waits (all but the first item's) given the change of the route's
+        wait total and the item that ends up first."""
+        route = self.sol.routes[uid]
+        old = route[0].wait if route else 0.0
+        new = new_first.wait if new_first is not None else 0.0
+        return total - (new - old)
+
+    def _insert_cost(self, uid: int, pos: int, node) -> float:
+        prev, nxt = self._at(uid, pos - 1), self._at(uid, pos)
+        return self._link(prev, node) + self._link(node, nxt) - self._leg(uid, pos - 1)
+
+    def _remove_cost(self, uid: int, pos: int) -> float:
+        prev, nxt = self._at(uid, pos - 1), self._at(uid, pos + 1)
+        return self._link(prev, nxt) - self._leg(uid, pos - 1) - self._leg(uid, pos)
+
+    def insertion_costs(self, uid: int, it: RouteItem) -> np.ndarray:
+        """Travel increase for inserting `it` before each position 1..len-1 (between existing items)."""
+        xy, rows = self.xy[uid], self.rows[uid]
+        if len(xy) < 2:
+            return np.zeros(0)
+        r = self._row(it)
+        if self._D is not None and r >= 0 and (rows >= 0).all():
+            d = self._D[r, rows].astype(float)
+        else:
+            d = np.hypot(xy[:, 0] - it.x, xy[:, 1] - it.y)
+        return d[:-1] + d[1:] - np.diff(self.prefix[uid])
+
+    def insertion_costs_many(self, uid: int, items) -> np.ndarray:
+        """insertion_costs for several items at once: (len(items), len-1)."""
+        xy, rows = self.xy[uid], self.rows[uid]
+        if len(xy) < 2 or not len(items):
+            return np.zeros((len(items), max(0, len(xy) - 1)))
+        r = np.array([self._row(it) for it in items])
+        if self._D is not None and (r >= 0).all() and (rows >= 0).all():
+            d = self._D[np.ix_(r, rows)].astype(float)
+        else:
+            p = np.array([(it.x, it.y) for it in items], dtype=float)
+            d = np.hypot(p[:, None, 0] - xy[None, :, 0], p[:, None, 1] - xy[None, :, 1])
+        return d[:, :-1] + d[:, 1:] - np.diff(self.prefix[uid])[None, :]
+
+    def removal_savings(self, uid: int) -> np.ndarray:
+        """Travel saved by removing each interior item of a route (positions 1..len-2)."""
+        xy, pre = self.xy[uid], self.prefix[uid]
+        if len(xy) < 3:
+            return np.zeros(0)
+        legs = np.diff(pre)
+        skip = np.hypot(xy[2:, 0] - xy[:-2, 0], xy[2:, 1] - xy[:-2, 1])
+        return legs[:-1] + legs[1:] - skip
+
+    def insert_delta(self, uid: int, pos: int, it: RouteItem) -> MoveDelta:
+        route = self.sol.routes[uid]
+        first = it if pos == 0 else route[0]
+        return self._delta({uid: (self._insert_cost(uid, pos, self.item_node(it)), self._dw(uid, it.wait, first))})
+
+    def remove_delta(self, uid: int, pos: int) -> MoveDelta:
+        route = self.sol.routes[uid]
+        first = route[0] if pos > 0 else (route[1] if len(route) > 1 else None)
+        return self._delta({uid: (self._remove_cost(uid, pos), self._dw(uid, -route[pos].wait, first))})
+
+    def relocate_delta(self, u: int, i: int, v: int, j: int) -> MoveDelta:
+        """Move item i of route u before position j of route v (j indexes v after the removal)."""
+        it = self.sol.routes[u][i]
+        node = self._node(u, i)
+        ru, rv = self.sol.routes[u], self.sol.routes[v]
+        if u != v:
+            first_u = ru[0] if i > 0 else (ru[1] if len(ru) > 1 else None)
+            first_v = it if j == 0 else rv[0]
+            return self._delta({u: (self._remove_cost(u, i), self._dw(u, -it.wait, first_u)),
+                                v: (self._insert_cost(v, j, node), self._dw(v, it.wait, first_v))})
+        n = len(self.rows[u])
+        at = lambda k: self._at(u, k if k < i else k + 1) if 0 <= k < n - 1 else None
+        prev, nxt = at(j - 1), at(j)
+        d_ins = self._link(prev, node) + self._link(node, nxt) - (self._link(prev, nxt) if nxt is not None else 0.0)
+        first = it if j == 0 else (ru[0] if i > 0 else ru[1])
+        return self._delta({u: (self._remove_cost(u, i) + d_ins, self._dw(u, 0.0, first))})
+
+    def or_opt_delta(self, u: int, i: int, L: int, v: int, j: int) -> MoveDelta:
+        """Move the segment of items i..i+L-1 of route u (order kept) before position j of route v
+        (j indexes v after the segment is removed)."""
+        ru, rv = self.sol.routes[u], self.sol.routes[v]
+        a, b = self._node(u, i), self._node(u, i + L - 1)
+        inner = self.segment_length(u, i, i + L - 1)
+        seg_wait = sum(it.wait for it in ru[i:i+L])
+        d_rem = self._link(self._at(u, i - 1), self._at(u, i + L)) - self._leg(u, i - 1) - self._leg(u, i + L - 1) - inner
+        rest_first = ru[0] if i > 0 else (ru[L] if len(ru) > L else None)
+        if u != v:
+            d_ins = self._link(self._at(v, j - 1), a) + inner + self._link(b, self._at(v, j)) - self._leg(v, j - 1)
+            return self._delta({u: (d_rem, self._dw(u, -seg_wait, rest_first)),
+                                v: (d_ins, self._dw(v, seg_wait, ru[i] if j == 0 else rv[0]))})
+        n = len(self.rows[u])
+        at = lambda k: self._at(u, k if k < i else k + L) if 0 <= k < n - L else None
+        prev, nxt = at(j - 1), at(j)
+        d_ins = self._link(prev, a) + inner + self._link(b, nxt) - self._link(prev, nxt)
+        return self._delta({u: (d_rem + d_ins, self._dw(u, 0.0, ru[i] if j == 0 else rest_first))})
+
+    def swap_delta(self, u: int, i: int, v: int, j: int) -> MoveDelta:
+        """Exchange item i of route u with item j of route v."""
+        a, b = self._node(u, i), self._node(v, j)
+        ru, rv = self.sol.routes[u], self.sol.routes[v]
+        wa, wb = ru[i].wait, rv[j].wait
+        if u != v:
+            def repl(uid, k, new):
+                prev, nxt = self._at(uid, k - 1), self._at(uid, k + 1)
+                return self._link(prev, new) + self._link(new, nxt) - self._leg(uid, k - 1) - self._leg(uid, k)
+            return self._delta({u: (repl(u, i, b), self._dw(u, wb - wa, rv[j] if i == 0 else ru[0])),
+                                v: (repl(v, j, a), self._dw(v, wa - wb, ru[i] if j == 0 else rv[0]))})
+        if i == j:
+            return self._delta({})
+        i, j = min(i, j), max(i, j)
+        a, b = self._node(u, i), self._node(u, j)
+        prev, nxt = self._at(u, i - 1), self._at(u, j + 1)
+        if j == i + 1:
+            old = self._leg(u, i - 1) + self._leg(u, i) + self._leg(u, j)
+            new = self._link(prev, b) + self._link(b, a) + self._link(a, nxt)
+        else:
+            ai, bj = self._at(u, i + 1), self._at(u, j - 1)
+            old = self._leg(u, i - 1) + self._leg(u, i) + self._leg(u, j - 1) + self._leg(u, j)
+            new = self._link(prev, b) + self._link(b, ai) + self._link(bj, a) + self._link(a, nxt)
+        return self._delta({u: (new - old, self._dw(u, 0.0, ru[j] if i == 0 else ru[0]))})
+
+    def two_opt_delta(self, uid: int, i: int, j: int) -> MoveDelta:
+        """Reverse items i..j of a route (symmetric distances keep the inner legs)."""
+        prev, nxt = self._at(uid, i - 1), self._at(uid, j + 1)
+        a, b = self._node(uid, i), self._node(uid, j)
+        d = self._link(prev, b) + self._link(a, nxt) - self._leg(uid, i - 1) - self._leg(uid, j)
+        route = self.sol.routes[uid]
+        return self._delta({uid: (d, self._dw(uid, 0.0, route[j] if i == 0 else route[0]))})
+
+    # ---- apply (mutates the solution through its hash-maintaining edit helpers,
+    #      refreshes touched routes only) ----
+    def insert(self, uid: int, pos: int, it: RouteItem):
+        self.sol.insert_item(uid, pos, it)
+        self.refresh(uid)
+
+    def remove(self, uid: int, pos: int) -> RouteItem:
+        it = self.sol.remove_item(uid, pos)
+        self.refresh(uid)
+        return it
+
+    def relocate(self, u: int, i: int, v: int, j: int):
+        it = self.sol.remove_item(u, i)
+        self.sol.insert_item(v, j, it)
+        self.refresh(u)
+        if v != u:
+            self.refresh(v)
+
+    def or_opt(self, u: int, i: int, L: int, v: int, j: int):
+        seg = self.sol.routes[u][i:i+L]
+        self.sol.replace_items(u, i, i + L, [])
+        self.sol.replace_items(v, j, j, seg)
+        self.refresh(u)
+        if v != u:
+            self.refresh(v)
+
+    def swap(self, u: int, i: int, v: int, j: int):
+        a, b = self.sol.routes[u][i], self.sol.routes[v][j]
+        self.sol.replace_items(u, i, i + 1, [b])
+        self.sol.replace_items(v, j, j + 1, [a])
+        self.refresh(u)
+        if v != u:
+            self.refresh(v)
+
+    def two_opt(self, uid: int, i: int, j: int):
+        self.sol.replace_items(uid, i, j + 1, self.sol.routes[uid][i:j+1][::-1])
+        self.refresh(uid)
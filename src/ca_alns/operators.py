@@ -0,0 +1,179 @@
+"""Destroy / repair operators over route-based Solutions.
+
+Removal operators take q targets out of the routes and return them; insertion operators put
+them back. Both work through a RouteEvaluator, so leg prefix sums and the solution's structural
+hash stay current after every edit.
+
+Insertion costs live in InsertionCostCache: the best cost and position of every pending item in
+every route. After an insertion only the touched route's column is recomputed (one vectorized
+call), so regret-k costs O(n_items) work per step instead of O(n_items * n_routes).
+
+Signatures: destroy(ev, rng, q, inst) -> removed items; repair(ev, items, rng, noise=0.0) -> None.
+noise > 0 scales every insertion cost by a random factor in [1-noise, 1+noise] (Ropke & Pisinger's
+noised insertion), so repeated repairs of the same partial solution can differ.
+"""
+from functools import partial
+from typing import Callable, Dict, List, Tuple
+import numpy as np
+
+from .moves import RouteEvaluator
+from .problem import Instance, RouteItem
+
+def _target_locs(sol) -> List[Tuple[int, int]]:
+    return [(uid, pos) for uid, route in sol.routes.items() for pos, it in enumerate(route) if it.kind == 'target']
+
+def _remove_at(ev: RouteEvaluator, picks: List[Tuple[int, int]]) -> List[RouteItem]:
+    """Remove items at (uid, pos) locations; positions refer to the routes before any removal."""
+    out = []
+    for uid, pos in sorted(picks, key=lambda p: (p[0], -p[1])):
+        out.append(ev.remove(uid, pos))
+    return out
+
+def _pick(rng, n: int, p: float) -> int:
+    """Index into a list sorted by preference, biased to the front (Ropke & Pisinger's y^p rule)."""
+    return min(n - 1, int(n * rng.random() ** p))
+
+# ---- removal ----
+def random_removal(ev: RouteEvaluator, rng, q: int, inst: Instance = None) -> List[RouteItem]:
+    locs = _target_locs(ev.sol)
+    return _remove_at(ev, rng.sample(locs, min(q, len(locs))))
+
+def worst_removal(ev: RouteEvaluator, rng, q: int, inst: Instance = None, p: float = 3.0) -> List[RouteItem]:
+    """Repeatedly remove a target with large removal savings. Savings of all interior items sit in
+    one flat array (a slice per route, masked to targets); after a removal only that route's slice
+    is rewritten, and candidates are ranked by one stable argsort."""
+    sol = ev.sol
+    uids = list(sol.routes)
+    sizes = np.array([max(0, len(sol.routes[u]) - 2) for u in uids])
+    offsets = np.concatenate(([0], np.cumsum(sizes)))
+    sav = np.zeros(offsets[-1])
+    mask = np.zeros(offsets[-1], dtype=bool)
+
+    def fill(s: int):
+        route, o = sol.routes[uids[s]], offsets[s]
+        n = max(0, len(route) - 2)
+        sav[o:o + n] = ev.removal_savings(uids[s])
+        mask[o:offsets[s + 1]] = False
+        mask[o:o + n] = [it.kind == 'target' for it in route[1:-1]]
+
+    for s in range(len(uids)):
+        fill(s)
+    out = []
+    for _ in range(q):
+        idx = np.flatnonzero(mask)
+        if not len(idx):
+            break
+        i = idx[np.argsort(-sav[idx], kind='stable')[_pick(rng, len(idx), p)]]
+        s = int(np.searchsorted(offsets, i, side='right')) - 1
+        out.append(ev.remove(uids[s], int(i - offsets[s]) + 1))
+        fill(s)
+    return out
+
+def shaw_removal(ev: RouteEvaluator, rng, q: int, inst: Instance, k: int = 10, p: float = 6.0) -> List[RouteItem]:
+    """Related removal: grow the removed set through the k-nearest-target lists of removed targets."""
+    sol = ev.sol
+    where = {it.node_id: uid for uid, route in sol.routes.items() for it in route if it.kind == 'target'}
+    if not where:
+        return []
+    knn = inst.knn_lists(k)
+    tpos = {t.id: j for j, t in enumerate(inst.targets)}
+    removed: List[int] = [rng.choice(sorted(where))]
+    while len(removed) < min(q, len(where)):
+        ref = rng.choice(removed)
+        near = [inst.targets[j].id for j in knn[tpos[ref]].tolist()]
+        near = [n for n in near if n in where and n not in removed]
+        if near:
+            removed.append(near[_pick(rng, len(near), p)])
+        else:
+            rest = sorted(set(where) - set(removed))
+            removed.append(rng.choice(rest))
+    picks = []
+    for nid in removed:
+        uid = where[nid]
+        pos = next(i for i, it in enumerate(sol.routes[uid]) if it.kind == 'target' and it.node_id == nid)
+        picks.append((uid, pos))
+    return _remove_at(ev, picks)
+
+def route_removal(ev: RouteEvaluator, rng, q: int, inst: Instance = None) -> List[RouteItem]:
+    """Empty one random non-empty route (q is ignored: the whole route goes)."""
+    uids = [uid for uid, route in ev.sol.routes.items() if any(it.kind == 'target' for it in route)]
+    if not uids:
+        return []
+    uid = rng.choice(uids)
+    return _remove_at(ev, [(uid, pos) for pos, it in enumerate(ev.sol.routes[uid]) if it.kind == 'target'])
+
+# ---- insertion ----
+class InsertionCostCache:
+    """Best insertion cost / position of each pending item in each route; columns are recomputed
+    only for routes marked stale by invalidate(); noise > 0 perturbs the costs (needs rng)."""
+    def __init__(self, ev: RouteEvaluator, items: List[RouteItem], rng=None, noise: float = 0.0):
+        self.ev = ev
+        self.rng, self.noise = rng, noise if rng is not None else 0.0
+        self.items = list(items)
+        self.uids = list(ev.uids)
+        self._col = {u: r for r, u in enumerate(self.uids)}
+        self.cost = np.full((len(self.items), len(self.uids)), np.inf)
+        self.pos = np.full((len(self.items), len(self.uids)), -1, dtype=int)
+        self.pending = np.ones(len(self.items), dtype=bool)
+        self._stale = set(range(len(self.uids)))
+        self.recomputed = 0   # columns rebuilt
+
+    def invalidate(self, uid: int):
+        self._stale.add(self._col[uid])
+
+    def refresh(self):
+        idx = np.flatnonzero(self.pending)
+        for r in self._stale:
+            C = self.ev.insertion_costs_many(self.uids[r], [self.items[i] for i in idx])
+            if C.shape[1] == 0:
+                self.cost[idx, r], self.pos[idx, r] = np.inf, -1
+            else:
+                if self.noise > 0:
+                    C = C * (1.0 + self.noise * np.array([[self.rng.uniform(-1.0, 1.0)] for _ in idx]))
+                j = C.argmin(axis=1)
+                self.cost[idx, r], self.pos[idx, r] = C[np.arange(len(idx)), j], j + 1
+            self.recomputed += 1
+        self._stale.clear()
+
+    def insert(self, i: int, r: int):
+        uid = self.uids[r]
+        self.ev.insert(uid, int(self.pos[i, r]), self.items[i])
+        self.pending[i] = False
+        self.invalidate(uid)
+
+def greedy_insertion(ev: RouteEvaluator, items: List[RouteItem], rng=None, noise: float = 0.0):
+    """Insert the globally cheapest (item, route, position) until no item is pending."""
+    cache = InsertionCostCache(ev, items, rng, noise)
+    while cache.pending.any():
+        cache.refresh()
+        C = np.where(cache.pending[:, None], cache.cost, np.inf)
+        i, r = np.unravel_index(int(np.argmin(C)), C.shape)
+        cache.insert(i, r)
+
+def regret_insertion(ev: RouteEvaluator, items: List[RouteItem], rng=None, k: int = 2, noise: float = 0.0):
+    """Regret-k: insert first the item that loses most by not getting its best route
+    (sum of the gaps between its best and its 2nd..k-th best routes)."""
+    cache = InsertionCostCache(ev, items, rng, noise)
+    k = max(2, min(k, len(cache.uids)))
+    while cache.pending.any():
+        cache.refresh()
+        idx = np.flatnonzero(cache.pending)
+        C = np.sort(cache.cost[idx], axis=1)
+        if C.shape[1] < 2:
+            regret = np.zeros(len(idx))
+        else:
+            with np.errstate(invalid='ignore'):
+                regret = np.nan_to_num((C[:, 1:k] - C[:, :1]).sum(axis=1), nan=0.0, posinf=np.inf)
+        # largest regret first, ties broken by the cheaper best insertion
+        best = idx[np.lexsort((C[:, 0], -regret))[0]]
+        cache.insert(best, int(np.argmin(cache.cost[best])))
+
+def default_alns_operators(k_regret: int = 3, shaw_k: int = 10) -> Tuple[Dict[str, Callable], Dict[str, Callable]]:
+    """Destroy and repair operator tables used by CAALNSFull; repair holds greedy and regret-2 up
+    to regret-k_regret."""
+    destroy = {'random': random_removal, 'worst': worst_removal,
+               'shaw': partial(shaw_removal, k=shaw_k), 'route': route_removal}
+    repair = {'greedy': greedy_insertion}
+    for k in range(2, max(2, k_regret) + 1):
+        repair[f'regret{k}'] = partial(regret_insertion, k=k)
+    return destroy, repair
@@ -1,7 +1,12 @@
 
 from dataclasses import dataclass, field
-from typing import List, Dict, Tuple
+from typing import Any, List, Dict, Optional, Tuple
+import hashlib
 import math
+import random
+import struct
+from types import MappingProxyType
+import numpy as np
 
 @dataclass
 class Node:
@@ -16,16 +21,86 @@ class UAV:
     battery_max: float = 1e9
     capacity: float = 1e9
 
+try:
+    from scipy.spatial import cKDTree as _KDTree
+except Exception:
+    _KDTree = None
+
 @dataclass
 class Instance:
     depot: Node
     targets: List[Node]
     uavs: List[UAV]
+    dist_dtype: str = "float64"   # 'float32' halves the distance matrix at XL scale
+    _D: Optional[np.ndarray] = field(default=None, init=False, repr=False, compare=False)
+    _index: Optional[Dict[int, int]] = field(default=None, init=False, repr=False, compare=False)
+    _tree: Any = field(default=None, init=False, repr=False, compare=False)
+    _knn: Dict[int, np.ndarray] = field(default_factory=dict, init=False, repr=False, compare=False)
+
+    @property
+    def node_index(self) -> Dict[int, int]:
+        """node id -> row of distance_matrix(); row 0 is the depot, then targets in order."""
+        if self._index is None:
+            self._index = {n.id: i for i, n in enumerate([self.depot] + self.targets)}
+        return self._index
+
+    def fingerprint(self) -> str:
+        """Stable digest of node ids/coordinates and UAV parameters (persistent cache key)."""
+        h = hashlib.blake2b(digest_size=16)
+        h.update(np.array([n.id for n in [self.depot] + self.targets], dtype=np.int64).tobytes())
+        h.update(self.coords().tobytes())
+        h.update(np.array([(u.id, u.v_max, u.battery_max, u.capacity) for u in self.uavs], dtype=float).tobytes())
+        return h.hexdigest()
+
+    def coords(self) -> np.ndarray:
+        return np.array([(n.x, n.y) for n in [self.depot] + self.targets], dtype=float)
+
+    def distance_matrix(self) -> np.ndarray:
+        """Depot+targets distance matrix, built on first use."""
+        if self._D is None:
+            C = self.coords()
+            diff = C[:, None, :] - C[None, :, :]
+            self._D = np.hypot(diff[..., 0], diff[..., 1]).astype(self.dist_dtype)
+        return self._D
+
+    def distance(self, a_id: int, b_id: int) -> float:
+        idx = self.node_index
+        return float(self.distance_matrix()[idx[a_id], idx[b_id]])
+
+    def nearest_targets(self, node_id: int, k: int) -> List[int]:
+        """Ids of the k targets closest to node_id (excluding itself)."""
+        row = self.node_index[node_id]
+        return [self.targets[j].id for j in self._nearest_rows(np.array([row]), k)[0]]
+
+    def knn_lists(self, k: int) -> np.ndarray:
+        """(n_targets, k) target positions (0-based into self.targets) of each target's k nearest targets."""
+        k = max(0, min(k, len(self.targets) - 1))
+        if k not in self._knn:
+            self._knn[k] = self._nearest_rows(np.arange(1, len(self.targets) + 1), k)
+        return self._knn[k]
+
+    def _nearest_rows(self, rows: np.ndarray, k: int) -> np.ndarray:
+        n = len(self.targets)
+        k = max(0, min(k, n - (1 if len(rows) and rows.min() > 0 else 0)))
+        if k == 0 or n == 0:
+            return np.zeros((len(rows), 0), dtype=int)
+        T = self.coords()[1:]
+        if _KDTree is not None:
+            if self._tree is None:
+                self._tree = _KDTree(T)
+            _, nn = self._tree.query(self.coords()[rows], k=min(k + 1, n))
+            nn = np.asarray(nn).reshape(len(rows), -1)
+        else:
+            d = self.distance_matrix()[np.ix_(rows, np.arange(1, n + 1))]
+            nn = np.argsort(d, axis=1, kind='stable')[:, :k + 1]
+        # drop the query node itself (target row r sits at position r-1)
+        out = [[j for j in r if j != row - 1][:k] for r, row in zip(nn.tolist(), rows.tolist())]
+        return np.array(out, dtype=int).reshape(len(rows), k)
 
 def dist(a: Tuple[float,float], b: Tuple[float,float]) -> float:
     return math.hypot(a[0]-b[0], a[1]-b[1])
 
-@dataclass
+@dataclass(frozen=True)
 class RouteItem:
     kind: str   # 'target' or 'rp' or 'depot'
     node_id: int
@@ -33,42 +108,190 @@ class RouteItem:
     y: float
     wait: float = 0.0
 
-@dataclass
+def route_length(route: List[RouteItem], inst: Optional[Instance] = None) -> float:
+    """Travelled distance along a route. With inst, depot/target legs are distance-matrix lookups;
+    rally points are not instance nodes and fall back to Euclidean distance."""
+    if len(route) < 2:
+        return 0.0
+    if inst is None:
+        return sum(dist((route[i].x, route[i].y), (route[i+1].x, route[i+1].y)) for i in range(len(route)-1))
+    idx = inst.node_index
+    rows = np.array([idx.get(it.node_id, -1) if it.kind != 'rp' else -1 for it in route])
+    a, b = rows[:-1], rows[1:]
+    known = (a >= 0) & (b >= 0)
+    total = float(inst.distance_matrix()[a[known], b[known]].sum(dtype=float))
+    for i in np.flatnonzero(~known):
+        total += dist((route[i].x, route[i].y), (route[i+1].x, route[i+1].y))
+    return total
+
+# ---- Zobrist-style structural hashing ----
+# A route is hashed as the XOR of 64-bit keys of its directed edges START->r0->...->r_n->END,
+# salted with the UAV id. Inserting, removing or re-waiting one item flips only the (at most
+# three) edges around it, so route edits update the hash in O(1). A second hash built the same
+# way from independently seeded keys (salt=CHECK_SALT) serves as the cache collision check.
+
+_MASK64 = (1 << 64) - 1
+_ROUTE_START = 0x5A17
+_ROUTE_END = 0xE7D0
+CHECK_SALT = 0xC3A5C85C97CB3127
+
+def mix64(x: int) -> int:
+    """splitmix64 finalizer; deterministic across processes, unlike hash()."""
+    x = (x + 0x9E3779B97F4A7C15) & _MASK64
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return x ^ (x >> 31)
+
+def _float_bits(f: float) -> int:
+    return struct.unpack('<Q', struct.pack('<d', float(f)))[0]
+
+def zobrist_item_key(kind: str, node_id: int, x: float, y: float, wait: float, salt: int = 0) -> int:
+    """Key of one route item; rally points have no node id, so their coordinates identify them."""
+    if kind == 'rp':
+        k = mix64(mix64(_float_bits(x) ^ salt) ^ _float_bits(y)) ^ 0x7270
+    else:
+        k = mix64((int(node_id) & _MASK64) ^ (0x64 if kind == 'depot' else 0x74) << 56)
+        k = mix64(k ^ salt) if salt else k
+    return mix64(k ^ _float_bits(wait)) if wait else k
+
+def zobrist_edge(uav_id: int, a: int, b: int, salt: int = 0) -> int:
+    return mix64(mix64(mix64((int(uav_id) & _MASK64) ^ salt) ^ a) ^ b)
+
+def zobrist_route(uav_id: int, keys, salt: int = 0) -> int:
+    h, prev = 0, _ROUTE_START
+    for k in keys:
+        h ^= zobrist_edge(uav_id, prev, k, salt)
+        prev = k
+    return h ^ zobrist_edge(uav_id, prev, _ROUTE_END, salt)
+
+def zobrist_splice(uav_id: int, prev: Optional[int], nxt: Optional[int], old: list, new: list, salt: int = 0) -> int:
+    """XOR delta for replacing the keys `old` between neighbours prev/nxt (None = route start/end) by `new`."""
+    prev = _ROUTE_START if prev is None else prev
+    nxt = _ROUTE_END if nxt is None else nxt
+    d = 0
+    for seq in ([prev] + list(old) + [nxt], [prev] + list(new) + [nxt]):
+        for a, b in zip(seq[:-1], seq[1:]):
+            d ^= zobrist_edge(uav_id, a, b, salt)
+    return d
+
+def _item_keys(it: RouteItem) -> Tuple[int, int]:
+    """(hash key, check key) of one item."""
+    return (zobrist_item_key(it.kind, it.node_id, it.x, it.y, it.wait),
+            zobrist_item_key(it.kind, it.node_id, it.x, it.y, it.wait, CHECK_SALT))
+
 class Solution:
-    routes: Dict[int, List[RouteItem]] = field(default_factory=dict)
+    """Routes per UAV. routes is a read-only mapping of uid -> tuple of (frozen) RouteItems; all
+    edits go through replace_items / insert_item / remove_item / set_wait, which keep
+    structural_hash() and cache_check() current in O(1) per edit. Copies share the route tuples."""
+    __slots__ = ('_routes', '_view', '_zkeys', '_zhash', '_zcheck')
 
-    def total_travel(self) -> float:
-        total = 0.0
-        for rid, route in self.routes.items():
-            for i in range(len(route)-1):
-                a = (route[i].x, route[i].y)
-                b = (route[i+1].x, route[i+1].y)
-                total += dist(a,b)
-        return total
-
-    def workload_extrema(self) -> Tuple[float,float]:
-        vals = []
-        for rid, route in self.routes.items():
-            s = 0.0
-            for i in range(len(route)-1):
-                a = (route[i].x, route[i].y)
-                b = (route[i+1].x, route[i+1].y)
-                s += dist(a,b)
-            vals.append(s)
+    def __init__(self, routes: Optional[Dict[int, Any]] = None):
+        self._routes: Dict[int, Tuple[RouteItem, ...]] = {uid: tuple(r) for uid, r in (routes or {}).items()}
+        self._view = MappingProxyType(self._routes)
+        self._zkeys: Optional[Dict[int, List[Tuple[int, int]]]] = None   # (hash key, check key) per item
+        self._zhash: Optional[int] = None
+        self._zcheck: Optional[int] = None
+
+    @property
+    def routes(self):
+        return self._view
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Solution) and self._routes == other._routes
+
+    def __repr__(self) -> str:
+        return f"Solution(routes={self._routes!r})"
+
+    def __reduce__(self):
+        return (Solution, (self._routes,))
+
+    def _zinit(self):
+        self._zkeys = {uid: [_item_keys(it) for it in route] for uid, route in self._routes.items()}
+        h = c = 0
+        for uid, keys in self._zkeys.items():
+            h ^= zobrist_route(uid, [k for k, _ in keys])
+            c ^= zobrist_route(uid, [k for _, k in keys], CHECK_SALT)
+        self._zhash, self._zcheck = h, c
+
+    def structural_hash(self) -> int:
+        if self._zhash is None:
+            self._zinit()
+        return self._zhash
+
+    def cache_check(self) -> int:
+        """Second, independently seeded Zobrist hash: stored next to cache entries keyed by
+        structural_hash() so that a 64-bit collision is detected instead of returning another
+        solution's fitness."""
+        if self._zcheck is None:
+            self._zinit()
+        return self._zcheck
+
+    def copy(self) -> 'Solution':
+        other = Solution()
+        other._routes.update(self._routes)
+        if self._zhash is not None:
+            other._zkeys = {uid: list(keys) for uid, keys in self._zkeys.items()}
+            other._zhash, other._zcheck = self._zhash, self._zcheck
+        return other
+
+    def replace_items(self, uid: int, i: int, j: int, items):
+        """routes[uid][i:j] = items, keeping both hashes current."""
+        route = self._routes[uid]
+        items = tuple(items)
+        if self._zhash is not None:
+            keys = self._zkeys[uid]
+            new = [_item_keys(it) for it in items]
+            prev = keys[i-1] if i > 0 else (None, None)
+            nxt = keys[j] if j < len(keys) else (None, None)
+            self._zhash ^= zobrist_splice(uid, prev[0], nxt[0], [k for k, _ in keys[i:j]], [k for k, _ in new])
+            self._zcheck ^= zobrist_splice(uid, prev[1], nxt[1], [k for _, k in keys[i:j]], [k for _, k in new],
+                                           CHECK_SALT)
+            keys[i:j] = new
+        self._routes[uid] = route[:i] + items + route[j:]
+
+    def insert_item(self, uid: int, pos: int, it: RouteItem):
+        self.replace_items(uid, pos, pos, [it])
+
+    def remove_item(self, uid: int, pos: int) -> RouteItem:
+        it = self._routes[uid][pos]
+        self.replace_items(uid, pos, pos + 1, [])
+        return it
+
+    def set_wait(self, uid: int, pos: int, wait: float):
+        it = self._routes[uid][pos]
+        self.replace_items(uid, pos, pos + 1, [RouteItem(it.kind, it.node_id, it.x, it.y, wait)])
+
+    def to_json(self) -> Dict[str, list]:
+        """JSON-able routes: {uid: [[kind, node_id, x, y, wait], ...]} (run JSONs)."""
+        return {str(uid): [[it.kind, it.node_id, it.x, it.y, it.wait] for it in route]
+                for uid, route in self._routes.items()}
+
+    @staticmethod
+    def from_json(routes: Dict[str, list]) -> 'Solution':
+        return Solution({int(uid): [RouteItem(*it) for it in route] for uid, route in routes.items()})
+
+    def total_travel(self, inst: Optional[Instance] = None) -> float:
+        return float(sum(route_length(route, inst) for route in self.routes.values()))
+
+    def workload_extrema(self, inst: Optional[Instance] = None) -> Tuple[float,float]:
+        vals = [route_length(route, inst) for route in self.routes.values()]
         return (max(vals) if vals else 0.0, min(vals) if vals else 0.0)
 
-    def makespan(self, uavs: List[UAV], v_default: float = 15.0) -> float:
+    def makespan(self, uavs: List[UAV], v_default: float = 15.0, inst: Optional[Instance] = None) -> float:
         ms = 0.0
         for rid, route in self.routes.items():
-            v = v_default
-            t = 0.0
-            for i in range(len(route)-1):
-                a = (route[i].x, route[i].y); b = (route[i+1].x, route[i+1].y)
-                seg = dist(a,b); t += seg / max(v,1e-6)
-                t += route[i+1].wait
+            t = route_length(route, inst) / max(v_default, 1e-6) + sum(it.wait for it in route[1:])
             ms = max(ms, t)
         return ms
 
+def gen_random_instance(seed: int, n_uav: int, n_targets: int, span: float, v_max: float) -> Instance:
+    """Depot at the origin, targets uniform in [-span, span]^2, identical UAVs."""
+    rng = random.Random(seed)
+    depot = Node(0, 0.0, 0.0)
+    targets = [Node(i+1, rng.uniform(-span, span), rng.uniform(-span, span)) for i in range(n_targets)]
+    uavs = [UAV(i, v_max=v_max) for i in range(n_uav)]
+    return Instance(depot=depot, targets=targets, uavs=uavs)
+
 def build_initial_solution(inst: Instance) -> 'Solution':
     routes: Dict[int, List[RouteItem]] = {}
     n_uav = len(inst.uavs)
@@ -83,44 +306,78 @@ def build_initial_solution(inst: Instance) -> 'Solution':
         routes[u.id].append(RouteItem('depot', d.id, d.x, d.y))
     return Solution(routes=routes)
 
+def route_timeline(route: List[RouteItem], v: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Piecewise-linear timeline of one route: cumulative times t (P,) and waypoints xy (P, 2).
+    Every visited item contributes an arrival point, plus a departure point if it has a wait."""
+    xy = np.array([(it.x, it.y) for it in route], dtype=float).reshape(-1, 2)
+    return _timeline_arrays(xy, np.array([it.wait for it in route], dtype=float), v)
+
+def _timeline_arrays(xy: np.ndarray, waits: np.ndarray, v: float) -> Tuple[np.ndarray, np.ndarray]:
+    if len(xy) <= 1:
+        return np.zeros(len(xy)), xy
+    w = np.maximum(waits[1:], 0.0)
+    step = np.diff(xy, axis=0)
+    dt = np.hypot(step[:, 0], step[:, 1]) / max(v, 1e-6)
+    depart = np.cumsum(dt + w)
+    arrive = depart - w
+    t = np.concatenate([[0.0], np.column_stack([arrive, depart]).ravel()])
+    pts = np.concatenate([xy[:1], np.repeat(xy[1:], 2, axis=0)])
+    keep = np.concatenate([[True], np.column_stack([np.ones(len(w), dtype=bool), w > 0]).ravel()])
+    return t[keep], pts[keep]
+
+def uav_timelines(sol, inst: Instance) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """route_timeline for every UAV, in inst.uavs order."""
+    return [route_timeline(sol.routes[u.id], u.v_max) for u in inst.uavs]
+
+def positions_at(t: np.ndarray, pts: np.ndarray, times) -> np.ndarray:
+    """Interpolated (len(times), 2) positions on a timeline; clamped to its end points."""
+    times = np.asarray(times, dtype=float)
+    if len(t) <= 1:
+        return np.repeat(pts[:1], len(times), axis=0)
+    i = np.clip(np.searchsorted(t, times, side='left'), 1, len(t) - 1)
+    t0, t1 = t[i-1], t[i]
+    span = t1 - t0
+    ratio = np.where(span > 0, np.clip((times - t0) / np.where(span > 0, span, 1.0), 0.0, 1.0), 1.0)
+    return pts[i-1] + ratio[:, None] * (pts[i] - pts[i-1])
+
+def simulate_positions(sol: 'Solution', inst: Instance, delta_tau: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Dense snapshot simulation: times (K,) at cadence delta_tau and positions (K, U, 2),
+    UAV axis in inst.uavs order."""
+    timelines = uav_timelines(sol, inst)
+    horizon = max((tl[0][-1] for tl in timelines if len(tl[0])), default=0.0)
+    K = int(math.ceil(horizon / max(delta_tau, 1e-6)))
+    times = np.arange(K+1) * delta_tau
+    if not timelines:
+        return times, np.zeros((K+1, 0, 2))
+    return times, np.stack([positions_at(t, pts, times) for t, pts in timelines], axis=1)
+
+def iter_snapshot_chunks(sol: 'Solution', inst: Instance, delta_tau: float,
+                         chunk: int = 256, order: str = "time"):
+    """Lazily yield (times, positions) chunks of the simulate_positions grid.
+    order='time' walks the horizon forwards; order='risk' visits chunks by decreasing
+    formation radius (max UAV distance from the centroid) probed at each chunk's midpoint."""
+    timelines = uav_timelines(sol, inst)
+    horizon = max((tl[0][-1] for tl in timelines if len(tl[0])), default=0.0)
+    K = int(math.ceil(horizon / max(delta_tau, 1e-6))) + 1
+    chunk = max(1, int(chunk))
+    starts = list(range(0, K, chunk))
+    if order == "risk" and len(starts) > 1 and timelines:
+        mids = np.array([0.5*(s + min(s+chunk, K) - 1) for s in starts]) * delta_tau
+        probe = np.stack([positions_at(t, pts, mids) for t, pts in timelines], axis=1)
+        radius = np.linalg.norm(probe - probe.mean(axis=1, keepdims=True), axis=-1).max(axis=1)
+        starts = [starts[i] for i in np.argsort(-radius, kind='stable')]
+    elif order not in ("time", "risk"):
+        raise ValueError(f"Unknown snapshot order: {order}")
+    for s in starts:
+        times = np.arange(s, min(s+chunk, K)) * delta_tau
+        if not timelines:
+            yield times, np.zeros((len(times), 0, 2))
+            continue
+        yield times, np.stack([positions_at(t, pts, times) for t, pts in timelines], axis=1)
+
 def simulate_snapshots(sol: 'Solution', inst: Instance, delta_tau: float, v_default: float = 15.0):
-    timelines = {}
-    horizon = 0.0
-    for u in inst.uavs:
-        route = sol.routes[u.id]
-        t = 0.0
-        pts = []
-        pts.append((t, (route[0].x, route[0].y)))
-        for i in range(len(route)-1):
-            a = (route[i].x, route[i].y); b=(route[i+1].x, route[i+1].y)
-            seg = dist(a,b); dt = seg / max(u.v_max, 1e-6)
-            t += dt
-            pts.append((t, b))
-            if i+1 < len(route):
-                w = route[i+1].wait
-                if w>0: 
-                    t += w
-                    pts.append((t, b))
-        timelines[u.id] = pts
-        horizon = max(horizon, t)
-    import math as _m
-    K = int(_m.ceil(horizon / max(delta_tau,1e-6)))
-    snaps = {}
-    for k in range(K+1):
-        tk = k*delta_tau
-        pos_k = {}
-        for u in inst.uavs:
-            pts = timelines[u.id]
-            for i in range(len(pts)-1):
-                t0, p0 = pts[i]
-                t1, p1 = pts[i+1]
-                if tk <= t1 or i==len(pts)-2:
-                    if t1==t0:
-                        pos = p1
-                    else:
-                        ratio = max(0.0, min(1.0, (tk - t0)/(t1 - t0)))
-                        pos = (p0[0] + ratio*(p1[0]-p0[0]), p0[1] + ratio*(p1[1]-p0[1]))
-                    pos_k[u.id] = pos
-                    break
-        snaps[tk] = pos_k
-    return snaps
+    """Dict view of simulate_positions: {t_k: {uav_id: (x, y)}}."""
+    times, P = simulate_positions(sol, inst, delta_tau)
+    ids = [u.id for u in inst.uavs]
+    return {float(tk): {uid: (float(P[k, j, 0]), float(P[k, j, 1])) for j, uid in enumerate(ids)}
+            for k, tk in enumerate(times)}
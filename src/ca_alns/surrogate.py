@@ -1,5 +1,5 @@
 
-import json, numpy as np
+import hashlib, json, numpy as np
 from pathlib import Path
 
 class FrozenSurrogate:
@@ -10,6 +10,7 @@ class FrozenSurrogate:
         self.mu = np.array(mu, dtype=float).reshape(-1)
         self.sigma = np.array(sigma, dtype=float).reshape(-1)
         self.band = float(band)
+        self._inv_sigma = 1.0 / np.maximum(self.sigma, 1e-9)
 
     @staticmethod
     def load(path: str):
@@ -18,10 +19,28 @@ class FrozenSurrogate:
         band = data.get("band", 0.05)
         return FrozenSurrogate(data["w"], data["b"], data["tau"], data["mu"], data["sigma"], band=band)
 
+    def fingerprint(self) -> str:
+        """Digest of the parameters (persistent cache keys)."""
+        params = [self.w.tolist(), self.b, self.tau, self.mu.tolist(), self.sigma.tolist(), self.band]
+        return hashlib.blake2b(json.dumps(params).encode('utf-8'), digest_size=16).hexdigest()
+
     def score(self, feats):
-        z = (np.array(feats, dtype=float).reshape(-1) - self.mu) / np.maximum(self.sigma, 1e-9)
+        z = (np.asarray(feats, dtype=float).reshape(-1) - self.mu) * self._inv_sigma
         s = 1.0 / (1.0 + np.exp(-(self.w @ z + self.b)))
         return float(s)
 
+    def score_batch(self, features):
+        """Scores (K,) for a feature matrix (K, F) in one matrix-vector product."""
+        X = np.asarray(features, dtype=float).reshape(-1, self.w.size)
+        return 1.0 / (1.0 + np.exp(-(((X - self.mu) * self._inv_sigma) @ self.w + self.b)))
+
     def is_borderline(self, s):
         return abs(s - self.tau) < self.band
+
+    def is_borderline_batch(self, scores):
+        return np.abs(np.asarray(scores, dtype=float) - self.tau) < self.band
+
+    def risk_masks(self, scores):
+        """(risky, borderline) boolean masks for a vector of scores."""
+        scores = np.asarray(scores, dtype=float)
+        return scores >= self.tau, self.is_borderline_batch(scores)
@@ -6,19 +6,26 @@ from ca_alns.config import ConnectivityConfig, OperatorConfig, BudgetConfig, Pen
 from ca_alns.eval import compute_upper_bounds
 from ca_alns.connectivity import compute_cadence_bound
 from ca_alns.core import CAALNSFull
+from ca_alns.islands import run_islands
+from ca_alns.fitness_store import open_fitness_store
+from ca_alns.budget import Deadline
 
 # Baselines
 from baselines.ga import GA
 from baselines.de import DE
 
 # Problem helpers
-from ca_alns.problem import Node, UAV, Instance
+from ca_alns.problem import gen_random_instance
 
 def parse_args():
     p = argparse.ArgumentParser(description="CA-ALNS / ALNS-Std / ALNS+LS / GA / DE experiment runner (fair budgets)")
     p.add_argument("--algo", choices=["ca-alns","alns-std","alns-ls","ga","de"], default="ca-alns")
     p.add_argument("--E_max", type=int, default=100000)
     p.add_argument("--T_max", type=float, default=0.0, help="0 = ignore wall time")
+    p.add_argument("--cache_size", type=int, default=1_000_000, help="max fitness-cache entries (0 = unbounded)")
+    p.add_argument("--cache_mb", type=float, default=0.0, help="fitness-cache byte budget in MB (0 = none)")
+    p.add_argument("--disk_cache", type=str, default="", help="SQLite fitness store shared across runs (empty = off)")
+    p.add_argument("--free_disk_hits", action="store_true", default=False, help="do not charge disk-cache hits to E_max")
     p.add_argument("--range_R", type=float, default=150.0)
     p.add_argument("--rho", type=float, default=15.0)
     p.add_argument("--vmax", type=float, default=15.0)
@@ -27,6 +34,10 @@ def parse_args():
     p.add_argument("--noise_dbm", type=float, default=-96.0)
     p.add_argument("--gamma_th_db", type=float, default=6.0)
     p.add_argument("--bidirectional", action="store_true", default=True)
+    p.add_argument("--interference", action="store_true", default=False)
+    p.add_argument("--snapshot_chunk", type=int, default=256)
+    p.add_argument("--snapshot_order", choices=["time","risk"], default="time")
+    p.add_argument("--verification", choices=["sampled","kinetic"], default="sampled")
 
     p.add_argument("--alpha", type=float, default=1.0)
     p.add_argument("--lambda_bal", type=float, default=0.0)
@@ -37,12 +48,16 @@ def parse_args():
     # variant-independent but can be overridden by variant flags
     p.add_argument("--use_rally", action="store_true", default=True)
     p.add_argument("--warm_blocks", type=int, default=3)
+    p.add_argument("--islands", type=int, default=1, help="ALNS island processes sharing E_max/T_max")
+    p.add_argument("--migrate_every", type=int, default=5, help="blocks between island migrations")
+    p.add_argument("--reward_mode", choices=["call","time","eval"], default="call", help="operator reward normalisation")
     p.add_argument("--p_warm", type=float, default=1e-2)
 
     # instance size
     p.add_argument("--n_uav", type=int, default=5)
     p.add_argument("--n_targets", type=int, default=20)
     p.add_argument("--span", type=float, default=500.0)
+    p.add_argument("--dist_float32", action="store_true", default=False, help="float32 distance matrix (XL)")
 
     # misc
     p.add_argument("--measure_energy", action="store_true", default=False)
@@ -51,13 +66,6 @@ def parse_args():
     p.add_argument("--out", type=str, default="runs/out.json")
     return p.parse_args()
 
-def gen_random_instance(seed: int, n_uav: int, n_targets: int, span: float, v_max: float) -> Instance:
-    rng = random.Random(seed)
-    depot = Node(0, 0.0, 0.0)
-    targets = [Node(i+1, rng.uniform(-span, span), rng.uniform(-span, span)) for i in range(n_targets)]
-    uavs = [UAV(i, v_max=v_max) for i in range(n_uav)]
-    return Instance(depot=depot, targets=targets, uavs=uavs)
-
 def _variant_flags(algo: str):
     """Returns dict: use_surrogate (safety-first), use_rally, enable_ls"""
     if algo == "ca-alns":
@@ -75,18 +83,27 @@ def main():
 
     # Instance
     inst = gen_random_instance(args.seed, n_uav=args.n_uav, n_targets=args.n_targets, span=args.span, v_max=args.vmax)
+    if args.dist_float32:
+        inst.dist_dtype = "float32"
 
     # Connectivity + cadence
     conn = ConnectivityConfig(mode=args.mode, R=args.range_R, rho=args.rho, v_max=args.vmax,
                               tx_power_dbm=args.tx_power_dbm, noise_dbm=args.noise_dbm,
-                              gamma_th_db=args.gamma_th_db, bidirectional=args.bidirectional)
+                              gamma_th_db=args.gamma_th_db, bidirectional=args.bidirectional,
+                              interference=args.interference,
+                              snapshot_chunk=args.snapshot_chunk, snapshot_order=args.snapshot_order,
+                              verification=args.verification)
     _ = compute_cadence_bound(conn.R, conn.rho, conn.v_max)
 
     # Budgets & penalties
-    ops = OperatorConfig(use_rally_points=args.use_rally, warm_blocks=args.warm_blocks, p_warm=args.p_warm)
-    bud = BudgetConfig(E_max=args.E_max, T_max=args.T_max if args.T_max>0 else None)
+    ops = OperatorConfig(use_rally_points=args.use_rally, warm_blocks=args.warm_blocks, p_warm=args.p_warm,
+                         reward_mode=args.reward_mode)
+    bud = BudgetConfig(E_max=args.E_max, T_max=args.T_max if args.T_max>0 else None,
+                       cache_size=args.cache_size or None,
+                       cache_bytes=int(args.cache_mb * 2**20) or None,
+                       disk_cache=args.disk_cache or None, charge_disk_hits=not args.free_disk_hits)
     coords = [(inst.depot.x, inst.depot.y)] + [(t.x, t.y) for t in inst.targets]
-    Cmax_aug = compute_upper_bounds(coords, depot_idx=0, n_uav=len(inst.uavs), alpha=args.alpha)
+    Cmax_aug = compute_upper_bounds(coords, depot_idx=0, n_uav=len(inst.uavs), alpha=args.alpha, D=inst.distance_matrix())
     lam = max(1.01*Cmax_aug, 1e3)
     pen = PenaltyConfig(alpha=args.alpha,
                         lambda_disc=lam, lambda_cap=lam, lambda_bat=lam,
@@ -97,33 +114,42 @@ def main():
     flags = _variant_flags(args.algo)
     # rally override
     ops.use_rally_points = bool(flags.get("use_rally", ops.use_rally_points))
-    # try to enable local search if OperatorConfig supports it (best-effort)
-    if flags.get("enable_ls", False):
-        try:
-            setattr(ops, "use_local_search", True)
-        except Exception:
-            pass
+    ops.apply_local_search = bool(flags.get("enable_ls", ops.apply_local_search))
 
     cfg = ExperimentConfig(connectivity=conn, operators=ops, budget=bud, penalties=pen)
     sur_file = str((Path(__file__).resolve().parents[2] / "artifacts" / "surrogate_frozen.json"))
 
     def run_algo():
-        if args.algo == "ga":
-            algo = GA(fitness_penalties=pen.__dict__, E_max=bud.E_max, seed=args.seed)
-            return algo.run({'total_travel': 100.0, 'connected': True, 'payload_ok': True, 'battery_ok': True})
-        elif args.algo == "de":
-            algo = DE(fitness_penalties=pen.__dict__, E_max=bud.E_max, seed=args.seed)
-            return algo.run({'total_travel': 100.0, 'connected': True, 'payload_ok': True, 'battery_ok': True})
+        if args.islands > 1 and args.algo not in ("ga", "de"):
+            spath = sur_file if flags.get("use_surrogate", True) else None
+            return run_islands(cfg, inst, args.islands, migrate_every=args.migrate_every,
+                               surrogate_path=spath, seed=args.seed)
+        if args.algo in ("ga", "de"):
+            Algo = GA if args.algo == "ga" else DE
+            algo = Algo(fitness_penalties=pen.__dict__, E_max=bud.E_max, seed=args.seed,
+                        cache_size=bud.cache_size, cache_bytes=bud.cache_bytes,
+                        store=open_fitness_store(bud, inst.fingerprint()), free_revisits=ops.free_revisits,
+                        deadline=Deadline(bud.T_max, bud.time_check_every))
         else:
             # ALNS family
             use_sur = flags.get("use_surrogate", True)
             spath = sur_file if use_sur else None
-            solver = CAALNSFull(cfg, rng, instance=inst, surrogate_path=spath)
-            if use_sur:
-                return solver.run_full(penalties_final=pen.__dict__, surrogate_path=spath)
+            algo = CAALNSFull(cfg, rng, instance=inst, surrogate_path=spath)
+        try:
+            if args.algo in ("ga", "de"):
+                res = algo.run({'total_travel': 100.0, 'connected': True, 'payload_ok': True, 'battery_ok': True})
             else:
-                # penalty-only path: pass no surrogate
-                return solver.run_full(penalties_final=pen.__dict__, surrogate_path=None)
+                # penalty-only variants were built without a surrogate
+                res = algo.run_full(penalties_final=pen.__dict__, surrogate_path=spath)
+        finally:
+            if algo.store is not None:
+                algo.store.close()
+        res['cache'] = algo.cache.stats()
+        if hasattr(algo, 'operator_stats'):
+            res['operators'] = algo.operator_stats()
+        if algo.store is not None:
+            res['disk_cache'] = algo.store.stats()
+        return res
 
     if args.measure_energy:
         # simple average-power energy estimate (portable)
@@ -140,7 +166,12 @@ def main():
     result.setdefault("connected", None)
     result.setdefault("snapshots_connected_pct", None)
     result.setdefault("E_used", None)
+    result.setdefault("E_revisits", None)
     result.setdefault("wallclock_s", None)
+    # enough to rebuild the instance the routes refer to (experiments.run_sweep --from_runs)
+    result["instance"] = dict(seed=args.seed, n_uav=args.n_uav, n_targets=args.n_targets, span=args.span,
+                              v_max=args.vmax)
+    result.setdefault("algo", args.algo)
 
     out = Path(args.out); out.parent.mkdir(parents=True, exist_ok=True)
     out.write_text(json.dumps(result, indent=2), encoding="utf-8")
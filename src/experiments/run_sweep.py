@@ -0,0 +1,91 @@
+import argparse, glob, json, time
+from pathlib import Path
+import numpy as np
+
+from ca_alns.connectivity import compute_cadence_bound, critical_radius, BottleneckProfile
+from ca_alns.problem import Solution, build_initial_solution, iter_snapshot_chunks, gen_random_instance
+
+def parse_args():
+    p = argparse.ArgumentParser(description="Range-mode R / rho / v_max sensitivity sweep (one simulation per v_max and cadence) "
+                                            "of the initial construction or, with --from_runs, of searched solutions")
+    p.add_argument("--from_runs", type=str, default="",
+                   help="glob of run_experiment JSONs: sweep R / rho over each run's best routes at the run's own "
+                        "v_max (--vmax and the instance options are then ignored)")
+    p.add_argument("--range_R", type=float, nargs="+", default=[150.0])
+    p.add_argument("--rho", type=float, nargs="+", default=[15.0])
+    p.add_argument("--vmax", type=float, nargs="+", default=[15.0])
+    p.add_argument("--n_uav", type=int, default=5)
+    p.add_argument("--n_targets", type=int, default=20)
+    p.add_argument("--span", type=float, default=500.0)
+    p.add_argument("--chunk", type=int, default=1024)
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--out", type=str, default="runs/sweep.json")
+    return p.parse_args()
+
+def sweep_profile(sol, inst, delta: float, chunk: int = 1024) -> BottleneckProfile:
+    """Bottleneck profile of one solution sampled every delta seconds."""
+    times, radius = [], []
+    for t, P in iter_snapshot_chunks(sol, inst, delta, chunk=chunk, order="time"):
+        times.append(t); radius.append(critical_radius(P))
+    return BottleneckProfile(np.concatenate(times), np.concatenate(radius))
+
+def sweep_rows(sol, inst, R_values, rho_values, chunk: int = 1024, **extra):
+    """One row per (R, rho), each verified at its own cadence bound. Pairs sharing a cadence
+    (same R - 2 rho) share one simulation and one critical-radius profile."""
+    v = max(u.v_max for u in inst.uavs)
+    profiles = {}
+    rows = []
+    for R in R_values:
+        for rho in rho_values:
+            delta = compute_cadence_bound(R, rho, v)
+            if delta not in profiles:
+                profiles[delta] = sweep_profile(sol, inst, delta, chunk=chunk)
+            prof = profiles[delta]
+            mask = prof.connected_mask(R, rho)
+            rows.append(dict(extra, R=R, rho=rho, delta_tau=delta, n_snapshots=len(prof.times),
+                             critical_radius=prof.critical,
+                             connected=bool(mask.all()),
+                             snapshots_connected_pct=100.0 * float(mask.mean()) if len(mask) else 100.0,
+                             min_margin=float(prof.margin(R, rho).min()) if len(mask) else None,
+                             first_disconnect_t=prof.first_violation(R, rho)))
+    return rows
+
+def load_run(path: str):
+    """(run JSON, instance, solution) of a run_experiment output; None if it has no routes (GA/DE)."""
+    data = json.loads(Path(path).read_text(encoding="utf-8"))
+    if not data.get("routes") or not data.get("instance"):
+        return None
+    spec = data["instance"]
+    inst = gen_random_instance(spec["seed"], n_uav=spec["n_uav"], n_targets=spec["n_targets"], span=spec["span"],
+                               v_max=spec["v_max"])
+    return data, inst, Solution.from_json(data["routes"])
+
+def main():
+    args = parse_args()
+    start = time.time()
+    rows = []
+    for fp in sorted(glob.glob(args.from_runs)) if args.from_runs else []:
+        run = load_run(fp)
+        if run is None:
+            print(f"{fp}: no routes, skipped")
+            continue
+        data, inst, sol = run
+        rows += sweep_rows(sol, inst, args.range_R, args.rho, chunk=args.chunk, run=fp, algo=data.get("algo"),
+                           vmax=data["instance"]["v_max"], seed=data["instance"]["seed"],
+                           total_travel=sol.total_travel())
+    for v in ([] if args.from_runs else args.vmax):
+        # UAV speeds change the trajectories themselves, so each v_max is simulated once
+        inst = gen_random_instance(args.seed, n_uav=args.n_uav, n_targets=args.n_targets, span=args.span, v_max=v)
+        sol = build_initial_solution(inst)
+        rows += sweep_rows(sol, inst, args.range_R, args.rho, chunk=args.chunk,
+                           vmax=v, seed=args.seed, total_travel=sol.total_travel())
+    result = {"rows": rows, "wallclock_s": time.time() - start}
+    out = Path(args.out); out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(result, indent=2), encoding="utf-8")
+    for r in rows:
+        print(f"{r['run'] + ': ' if 'run' in r else ''}v_max={r['vmax']:g} R={r['R']:g} rho={r['rho']:g}: connected={r['connected']} "
+              f"({r['snapshots_connected_pct']:.1f}% of {r['n_snapshots']} snapshots)")
+    print(f"{len(rows)} rows -> {out} ({result['wallclock_s']:.2f} s)")
+
+if __name__ == "__main__":
+    main()
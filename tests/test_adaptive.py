@@ -0,0 +1,35 @@
+import pytest
+
+from ca_alns.adaptive import AdaptiveWeights
+
+def _block(mode, calls, **kw):
+    """calls: {name: [(outcome, time_s, evals), ...]}; returns the weight each operator moves to
+    with reaction 1 (weight = reward)."""
+    aw = AdaptiveWeights(sorted(calls), 5.0, 2.0, 0.5, reaction=1.0, reward_mode=mode, w_min=0.0, **kw)
+    for name, rows in calls.items():
+        for outcome, t, e in rows:
+            aw.record(name, outcome, t, e)
+    aw.end_block()
+    return {n: aw.ops[n].weight for n in calls}
+
+def test_call_mode_is_mean_score_per_call():
+    w = _block('call', {'a': [('best', 1, 1), (None, 1, 1)], 'b': [('better', 1, 1)] * 4})
+    assert w == pytest.approx({'a': 2.5, 'b': 2.0})
+
+def test_time_mode_scales_with_own_cost_per_call():
+    # same score per call, b is 10x slower per call: 1/10 of a's reward
+    w = _block('time', {'a': [('better', 0.01, 1)] * 6, 'b': [('better', 0.1, 1)] * 2})
+    assert w['b'] / w['a'] == pytest.approx(0.1)
+
+def test_reward_does_not_depend_on_call_count():
+    # two equally cheap, equally successful operators; one called five times as often
+    w = _block('time', {'a': [('better', 0.01, 1)] * 5, 'b': [('better', 0.01, 1)],
+                        'c': [(None, 1.0, 1)] * 4})
+    assert w['a'] == pytest.approx(w['b'])
+
+def test_cost_ratio_clipped_symmetrically():
+    cap = 4.0
+    w = _block('eval', {'free': [('accepted', 0, 0)] * 2, 'dear': [('accepted', 0, 3)] * 2}, cost_ratio_cap=cap)
+    # block mean 1.5 evals per call: free has ratio 0 -> 1/cap, dear has ratio 2
+    assert w['free'] == pytest.approx(0.5 * cap)
+    assert w['dear'] == pytest.approx(0.5 / 2)
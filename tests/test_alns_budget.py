@@ -0,0 +1,23 @@
+import random
+
+from ca_alns.config import BudgetConfig, ConnectivityConfig, ExperimentConfig, OperatorConfig, PenaltyConfig
+from ca_alns.core import CAALNSFull
+from ca_alns.problem import gen_random_instance
+
+def _run(E_max, **ops):
+    inst = gen_random_instance(1, n_uav=4, n_targets=15, span=200.0, v_max=15.0)
+    cfg = ExperimentConfig(ConnectivityConfig(), OperatorConfig(**ops), BudgetConfig(E_max=E_max), PenaltyConfig())
+    algo = CAALNSFull(cfg, random.Random(0), instance=inst)
+    return algo, algo.run_full(penalties_final=cfg.penalties.__dict__)
+
+def test_alns_spends_whole_budget():
+    algo, res = _run(300)
+    assert res['stopped_by'] == 'E_max'
+    assert res['E_used'] + res['E_revisits'] == 300
+
+def test_revisits_are_charged_after_free_revisits():
+    # with no free revisits every candidate costs one unit of budget, cached or not; only the
+    # misses are evaluations
+    algo, res = _run(120, free_revisits=0, block_len=10)
+    assert res['E_used'] + res['E_revisits'] == 120
+    assert res['E_revisits'] == algo.cache.stats()['hits'] > 0
@@ -0,0 +1,36 @@
+import random
+
+import numpy as np
+import pytest
+
+from ca_alns.config import BudgetConfig, ConnectivityConfig, ExperimentConfig, OperatorConfig, PenaltyConfig
+from ca_alns.conncache import ConnectivityCache
+from ca_alns.core import CAALNSFull
+from ca_alns.moves import RouteEvaluator
+from ca_alns.operators import default_alns_operators
+from ca_alns.problem import build_initial_solution, gen_random_instance
+
+@pytest.mark.parametrize('mode', ['range', 'sinr'])
+def test_child_cache_matches_fresh_cache(mode):
+    inst = gen_random_instance(3, n_uav=4, n_targets=20, span=300.0, v_max=15.0)
+    cfg = ExperimentConfig(ConnectivityConfig(mode=mode, R=250.0), OperatorConfig(), BudgetConfig(), PenaltyConfig())
+    algo = CAALNSFull(cfg, random.Random(0), instance=inst)
+    destroy, repair = default_alns_operators()
+    rng = random.Random(1)
+    sol = build_initial_solution(inst)
+    conn = ConnectivityCache(sol, inst, cfg.connectivity, algo.delta_tau)
+    for step in range(30):
+        ev = RouteEvaluator(sol.copy(), inst, v_default=15.0)
+        removed = destroy[rng.choice(sorted(destroy))](ev, rng, rng.randint(1, 6), inst)
+        repair[rng.choice(sorted(repair))](ev, removed, rng, noise=0.3)
+        child = algo._child_conn(ev.sol, sol, conn)
+        fresh = ConnectivityCache(ev.sol, inst, cfg.connectivity, algo.delta_tau)
+        assert np.allclose(child.P, fresh.P)
+        assert (child.ok == fresh.ok).all()
+        assert np.allclose(child.margin, fresh.margin, equal_nan=True)
+        if step % 3 == 0:   # rally repair updates the cache in place
+            algo._attempt_rally_repair(ev.sol, conn_cache=child)
+            fresh = ConnectivityCache(ev.sol, inst, cfg.connectivity, algo.delta_tau)
+            assert (child.ok == fresh.ok).all()
+        sol, conn = ev.sol, child
+    assert conn.reverified > 0
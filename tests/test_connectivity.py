@@ -0,0 +1,45 @@
+import math
+
+import numpy as np
+import pytest
+
+from ca_alns.connectivity import pairwise_distances, rx_power_dbm, sinr_adjacency, sinr_db, snapshot_graph_sinr
+
+def _baseline_edges(positions, tx_power_dbm=20.0, noise_dbm=-96.0, gamma_th_db=6.0, bidirectional=True):
+    """The original scalar snapshot_graph_sinr: per pair, no interference, symmetric channel."""
+    ids = list(positions)
+    edges = {u: set() for u in ids}
+    for i, u in enumerate(ids):
+        for v in ids[i + 1:]:
+            d = max(1.0, math.hypot(positions[u][0] - positions[v][0], positions[u][1] - positions[v][1]))
+            s = sinr_db(rx_power_dbm(tx_power_dbm, d, los=d < 500.0), noise_dbm)
+            if s >= gamma_th_db:   # symmetric, so bidirectional or not gives the same rule
+                edges[u].add(v); edges[v].add(u)
+    return edges
+
+def test_third_transmitter_breaks_link():
+    # A, B, C on a line at 0, 100, 150 m; 20 dBm, -96 dBm noise, 6 dB threshold, path-loss exponent 2.1.
+    # Alone, every pair is far above threshold (A-C at 150 m: 20 - 32.4 - 21*log10(150) + 96 = 37.9 dB).
+    # With C transmitting, B hears A at (50/100)^2.1 of C's power: SINR = -21*log10(2) = -6.3 dB < 6,
+    # so A-B breaks. C -> B: 21*log10(2) = 6.3 dB and B -> C: 21*log10(3) = 10.0 dB, so B-C holds.
+    # A -> C is interfered by B at 50 m: -10.0 dB.
+    D = pairwise_distances(np.array([[0.0, 0.0], [100.0, 0.0], [150.0, 0.0]]))
+    assert 20 - 32.4 - 21 * math.log10(150) + 96 == pytest.approx(37.9, abs=0.05)
+    alone = sinr_adjacency(D, 20.0, -96.0, 6.0, interference=False)
+    assert alone.sum() == 6 and not alone.diagonal().any()
+    crowded = sinr_adjacency(D, 20.0, -96.0, 6.0, interference=True)
+    assert crowded.tolist() == [[False, False, False], [False, False, True], [False, True, False]]
+    # one-way decoding suffices without bidirectional: C decodes B and B decodes C, A still decodes no one
+    assert sinr_adjacency(D, 20.0, -96.0, 6.0, bidirectional=False, interference=True).tolist() == crowded.tolist()
+
+@pytest.mark.parametrize('seed', range(5))
+def test_no_interference_matches_scalar_baseline(seed):
+    rng = np.random.default_rng(seed)
+    pts = rng.uniform(-1500.0, 1500.0, size=(12, 2))
+    positions = {10 + i: (x, y, 100.0) for i, (x, y) in enumerate(pts.tolist())}
+    degrees = []
+    for gamma in (6.0, 20.0, 35.0):
+        got = snapshot_graph_sinr(positions, gamma_th_db=gamma, interference=False)
+        assert got == _baseline_edges(positions, gamma_th_db=gamma)
+        degrees.append(sum(map(len, got.values())))
+    assert 0 < degrees[0] < 12 * 11   # the layouts have both links and non-links
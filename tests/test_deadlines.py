@@ -0,0 +1,33 @@
+import random
+
+from baselines.de import DE
+from ca_alns.budget import Deadline
+from ca_alns.config import BudgetConfig, ConnectivityConfig, ExperimentConfig, OperatorConfig, PenaltyConfig
+from ca_alns.core import CAALNSFull
+from ca_alns.local_search import LocalSearch
+from ca_alns.problem import build_initial_solution, gen_random_instance
+
+def _inst():
+    return gen_random_instance(2, n_uav=3, n_targets=25, span=300.0, v_max=15.0)
+
+def test_local_search_stops_at_deadline():
+    inst = _inst()
+    ls = LocalSearch(inst)
+    assert ls.run(build_initial_solution(inst)).n_moves > 0
+    expired = Deadline(T_max=1e-9, every=1)
+    assert ls.run(build_initial_solution(inst), deadline=expired).n_moves == 0
+
+def test_run_full_skips_final_rally_repair_after_T_max():
+    inst = _inst()
+    cfg = ExperimentConfig(ConnectivityConfig(R=60.0), OperatorConfig(apply_local_search=True),
+                           BudgetConfig(E_max=10**6), PenaltyConfig())
+    algo = CAALNSFull(cfg, random.Random(0), instance=inst, deadline=Deadline(T_max=1e-9, every=1))
+    res = algo.run_full(penalties_final=cfg.penalties.__dict__)
+    assert res['stopped_by'] == 'T_max'
+    assert not res['connected'] and res['fitness'] is not None   # best as found, no repair pass
+
+def test_de_identical_seeds_end_on_charged_revisits():
+    de = DE(fitness_penalties=PenaltyConfig().__dict__, E_max=2000, free_revisits=50)
+    res = de.run({'total_travel': 100.0, 'connected': True, 'payload_ok': True, 'battery_ok': True})
+    assert res['stopped_by'] == 'E_max'
+    assert res['E_used'] < 10 and res['E_used'] + res['E_revisits'] == 2000
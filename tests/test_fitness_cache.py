@@ -0,0 +1,90 @@
+import random
+from collections import OrderedDict
+from pathlib import Path
+from types import SimpleNamespace
+
+from ca_alns.config import BudgetConfig, ConnectivityConfig, ExperimentConfig, OperatorConfig, PenaltyConfig
+from ca_alns.core import CAALNSFull
+from ca_alns.eval import EvalCounter, FitnessCache, fitness_value, fitness_wrapped, make_fitness_cache
+from ca_alns.problem import gen_random_instance
+
+def _reference(ops, max_entries):
+    """Brute-force LRU: a list ordered from least to most recently used."""
+    order, values, hits, misses, evictions = [], {}, 0, 0, 0
+    out = []
+    for op, k, v in ops:
+        if op == 'get':
+            if k in values:
+                hits += 1
+                order.remove(k); order.append(k)
+                out.append(values[k])
+            else:
+                misses += 1
+                out.append(None)
+        else:
+            out.append(None)
+            if k in values:
+                order.remove(k)
+            order.append(k); values[k] = v
+            while len(order) > max_entries:
+                del values[order.pop(0)]
+                evictions += 1
+    return out, order, hits, misses, evictions
+
+def _ops(seed, n=3000, keys=40):
+    rng = random.Random(seed)
+    return [(rng.choice(('get', 'put')), rng.randrange(keys), rng.random()) for _ in range(n)]
+
+def test_lru_matches_reference():
+    for seed, cap in ((0, 1), (1, 7), (2, 25)):
+        ops = _ops(seed)
+        cache = FitnessCache(max_entries=cap)
+        out = [cache.get(k) if op == 'get' else cache.put(k, v) for op, k, v in ops]
+        ref_out, ref_order, hits, misses, evictions = _reference(ops, cap)
+        assert [o for (op, _, _), o in zip(ops, out) if op == 'get'] == [o for (op, _, _), o in zip(ops, ref_out) if op == 'get']
+        assert list(cache._data) == ref_order
+        st = cache.stats()
+        assert (st['hits'], st['misses'], st['evictions']) == (hits, misses, evictions)
+        assert st['hit_rate'] == hits / (hits + misses)
+
+def test_byte_bound_and_accounting():
+    cache = FitnessCache(max_bytes=4000)
+    for op, k, v in _ops(3):
+        cache.get(k) if op == 'get' else cache.put(('key', k), v, check=(k,))
+        assert cache.nbytes == sum(FitnessCache._size(key, e) for key, e in cache._data.items())
+        assert cache.nbytes <= 4000
+    assert cache.evictions > 0
+    cache.clear()
+    assert cache.nbytes == 0 and len(cache) == 0
+
+def test_make_fitness_cache_bounds():
+    assert make_fitness_cache(SimpleNamespace(cache_size=0, cache_bytes=None)).max_entries is None
+    assert make_fitness_cache(SimpleNamespace(cache_size=5, cache_bytes=100)).max_bytes == 100
+
+def test_evicted_solutions_are_charged_again():
+    counter, cache = EvalCounter(E_max=100), FitnessCache(max_entries=2)
+    sols = [{'total_travel': float(i), 'connected': True, 'payload_ok': True, 'battery_ok': True} for i in range(3)]
+    pen = {'alpha': 1.0}
+    for s in sols + sols[2:] + sols[:1]:   # 0, 1, 2 then 2 (cached) and 0 (evicted)
+        fitness_wrapped(fitness_value, counter, cache, s, pen)
+    assert counter.used == 4
+    assert cache.stats()['hits'] == 1
+
+SURROGATE = str(Path(__file__).resolve().parents[1] / 'artifacts' / 'surrogate_frozen.json')
+
+def test_store_namespace_separates_evaluation_settings(tmp_path):
+    inst = gen_random_instance(1, n_uav=3, n_targets=10, span=200.0, v_max=15.0)
+
+    def namespace(seed=0, surrogate=None, **ops):
+        cfg = ExperimentConfig(ConnectivityConfig(), OperatorConfig(**ops),
+                               BudgetConfig(E_max=10, disk_cache=str(tmp_path / 'fitness.sqlite')), PenaltyConfig())
+        algo = CAALNSFull(cfg, random.Random(seed), instance=inst, surrogate_path=surrogate)
+        algo.store.close()
+        return algo.store.instance_fp
+
+    base = namespace()
+    assert namespace(seed=1) == base   # seeds of one variant share evaluations
+    variants = [namespace(use_rally_points=False), namespace(apply_local_search=True),
+                namespace(apply_local_search=True, ls_k=3), namespace(apply_local_search=True, ls_max_moves=7),
+                namespace(surrogate=SURROGATE)]
+    assert len({base, *variants}) == 1 + len(variants)
@@ -0,0 +1,37 @@
+import multiprocessing as mp
+import os
+
+import pytest
+
+from ca_alns import islands
+from ca_alns.config import BudgetConfig, ConnectivityConfig, ExperimentConfig, OperatorConfig, PenaltyConfig
+from ca_alns.problem import gen_random_instance
+
+def _cfg(E_max):
+    return ExperimentConfig(ConnectivityConfig(), OperatorConfig(block_len=10), BudgetConfig(E_max=E_max), PenaltyConfig())
+
+def _killed_worker(wid, *args):
+    if wid == 1:
+        os._exit(9)   # dies without reporting, like an OOM kill
+    return _worker(wid, *args)
+
+_worker = islands._island_worker
+
+@pytest.fixture
+def fork():
+    if 'fork' not in mp.get_all_start_methods():
+        pytest.skip('needs the fork start method')
+    return mp.get_context('fork')
+
+def test_islands_share_budget(fork):
+    inst = gen_random_instance(4, n_uav=3, n_targets=12, span=200.0, v_max=15.0)
+    res = islands.run_islands(_cfg(200), inst, n_islands=2, migrate_every=1, ctx=fork)
+    assert res['E_used'] == sum(res['E_used_per_island'])
+    assert res['E_used'] + res['E_revisits'] == 200
+    assert [r['island'] for r in res['islands']] == [0, 1]
+
+def test_dead_island_raises_instead_of_hanging(fork, monkeypatch):
+    monkeypatch.setattr(islands, '_island_worker', _killed_worker)
+    inst = gen_random_instance(4, n_uav=3, n_targets=12, span=200.0, v_max=15.0)
+    with pytest.raises(RuntimeError, match='island 1: exited with code 9'):
+        islands.run_islands(_cfg(10**7), inst, n_islands=2, ctx=fork)
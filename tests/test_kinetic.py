@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from ca_alns.config import ConnectivityConfig
+from ca_alns.connectivity import _sinr_db_matrix, bfs_connected_batch, pairwise_distances
+from ca_alns.kinetic import _crossing_times, kinetic_connectivity, link_radius
+from ca_alns.problem import build_initial_solution, gen_random_instance, positions_at, uav_timelines
+
+def _setup(seed, R):
+    inst = gen_random_instance(seed, n_uav=4, n_targets=16, span=250.0, v_max=15.0)
+    sol = build_initial_solution(inst)
+    return inst, sol, ConnectivityConfig(R=R, rho=10.0)
+
+def _dense(sol, inst, r, n=40001):
+    timelines = uav_timelines(sol, inst)
+    horizon = max(t[-1] for t, _ in timelines)
+    ts = np.linspace(0.0, horizon, n)
+    P = np.stack([positions_at(t, pts, ts) for t, pts in timelines], axis=1)
+    return ts, P, bfs_connected_batch(pairwise_distances(P) <= r)
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_crossing_times_are_roots(seed):
+    inst, sol, cfg = _setup(seed, 160.0)
+    r = link_radius(cfg)
+    timelines = uav_timelines(sol, inst)
+    B = np.unique(np.concatenate([t for t, _ in timelines]))
+    X = np.stack([positions_at(t, pts, B) for t, pts in timelines], axis=1)
+    roots = _crossing_times(B, X, r)
+    assert len(roots)
+    P = np.stack([positions_at(t, pts, roots) for t, pts in timelines], axis=1)
+    # at every root some pair sits exactly on the link radius
+    assert np.abs(pairwise_distances(P) - r).min(axis=(1, 2)) == pytest.approx(0.0, abs=1e-6)
+    # every sign change of (d - r) on a dense grid is bracketed by a root
+    ts, Pd, _ = _dense(sol, inst, r)
+    D = pairwise_distances(Pd)
+    iu, ju = np.triu_indices(Pd.shape[1], 1)
+    flips = np.flatnonzero(np.diff(np.sign(D[:, iu, ju] - r), axis=0).any(axis=1))
+    events = np.sort(roots)
+    for k in flips:
+        lo, hi = ts[k], ts[k + 1]
+        assert ((events >= lo - 1e-9) & (events <= hi + 1e-9)).any()
+
+@pytest.mark.parametrize('seed,R', [(0, 160.0), (1, 160.0), (2, 220.0), (3, 400.0)])
+def test_kinetic_matches_dense_sampling(seed, R):
+    inst, sol, cfg = _setup(seed, R)
+    rep = kinetic_connectivity(sol, inst, cfg)
+    ts, _, ok = _dense(sol, inst, link_radius(cfg))
+    assert rep.connected == ok.all()
+    assert rep.connected_fraction == pytest.approx(ok.mean(), abs=2e-3)
+    if not rep.connected:
+        first = ts[np.flatnonzero(~ok)[0]]
+        step = ts[1] - ts[0]
+        assert first - step <= rep.first_disconnect_t <= first + 1e-9
+
+def test_sinr_link_radius_is_threshold():
+    cfg = ConnectivityConfig(mode='sinr')
+    r = link_radius(cfg)
+    snr = lambda d: _sinr_db_matrix(np.array(d), cfg.tx_power_dbm, cfg.noise_dbm)
+    assert snr(r * (1 - 1e-6)) >= cfg.gamma_th_db > snr(r * (1 + 1e-6))
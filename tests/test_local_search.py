@@ -0,0 +1,123 @@
+import random
+
+import pytest
+
+from ca_alns import core
+from ca_alns.config import BudgetConfig, ConnectivityConfig, ExperimentConfig, OperatorConfig, PenaltyConfig
+from ca_alns.local_search import LocalSearch, LSResult
+from ca_alns.moves import RouteEvaluator
+from ca_alns.problem import RouteItem, build_initial_solution, gen_random_instance
+
+V = 12.0
+
+def _solution_with_waits(seed):
+    """Initial solution plus rally points with waits, so or-opt segments and route heads carry waits."""
+    inst = gen_random_instance(seed, n_uav=3, n_targets=12, span=250.0, v_max=V)
+    sol = build_initial_solution(inst)
+    rng = random.Random(seed)
+    for uid, route in list(sol.routes.items()):
+        for _ in range(2):
+            pos = rng.randint(1, len(sol.routes[uid]) - 1)
+            sol.insert_item(uid, pos, RouteItem('rp', -1, rng.uniform(-250, 250), rng.uniform(-250, 250),
+                                                wait=rng.choice([0.0, 3.0, 7.5])))
+    return inst, sol
+
+def _assert_matches(d, before, after):
+    assert d.d_travel == pytest.approx(after.loads.sum() - before.loads.sum(), abs=1e-9)
+    for uid, load in d.loads.items():
+        assert load == pytest.approx(after.loads[after._slot[uid]], abs=1e-9)
+    assert d.workload_max == pytest.approx(after.loads.max(), abs=1e-9)
+    assert d.workload_min == pytest.approx(after.loads.min(), abs=1e-9)
+    assert d.makespan == pytest.approx((after.loads / after.v + after.waits).max(), abs=1e-9)
+
+@pytest.mark.parametrize('seed', [0, 1])
+def test_or_opt_delta_matches_recompute(seed):
+    inst, sol = _solution_with_waits(seed)
+    ev = RouteEvaluator(sol, inst, v_default=V)
+    checked = 0
+    for u in ev.uids:
+        n_u = len(sol.routes[u])
+        for L in (2, 3):
+            for i in range(1, n_u - L):
+                for v in ev.uids:
+                    n_v = len(sol.routes[v]) - (L if u == v else 0)
+                    for j in range(1, n_v):
+                        if u == v and j == i:
+                            continue
+                        d = ev.or_opt_delta(u, i, L, v, j)
+                        moved = RouteEvaluator(sol.copy(), inst, v_default=V)
+                        moved.or_opt(u, i, L, v, j)
+                        fresh = RouteEvaluator(moved.sol, inst, v_default=V)
+                        _assert_matches(d, ev, fresh)
+                        assert moved.loads == pytest.approx(fresh.loads) and moved.waits == pytest.approx(fresh.waits)
+                        checked += 1
+    assert checked > 100
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_local_search_result_is_consistent(seed):
+    inst = gen_random_instance(seed, n_uav=3, n_targets=30, span=300.0, v_max=V)
+    sol = build_initial_solution(inst)
+    before = sol.total_travel(inst)
+    targets = sorted(t.id for t in inst.targets)
+    ls = LocalSearch(inst, k=8, v_default=V)
+    res = ls.run(sol)
+    assert res.n_moves > 0
+    assert sol.total_travel(inst) == pytest.approx(before + res.d_travel)
+    assert sorted(it.node_id for r in sol.routes.values() for it in r if it.kind == 'target') == targets
+    # every don't-look bit was set: a second full pass finds nothing
+    assert ls.run(sol).n_moves == 0
+    # after an edit, a rescan woken only around it still applies exact improvements
+    uid = next(u for u, r in sol.routes.items() if len(r) > 4)
+    edited = sol.copy()
+    RouteEvaluator(edited, inst, v_default=V).two_opt(uid, 1, len(sol.routes[uid]) - 2)
+    woken = edited.copy()
+    res = ls.run(woken, wake=LocalSearch.changed_targets(sol, edited))
+    assert woken.total_travel(inst) == pytest.approx(edited.total_travel(inst) + res.d_travel)
+    assert res.d_travel <= 0
+
+def test_run_full_drops_initial_local_search_that_disconnects(monkeypatch):
+    inst = gen_random_instance(3, n_uav=3, n_targets=12, span=200.0, v_max=V)
+    cfg = ExperimentConfig(ConnectivityConfig(), OperatorConfig(apply_local_search=True), BudgetConfig(E_max=10),
+                           PenaltyConfig())
+    algo = core.CAALNSFull(cfg, random.Random(0), instance=inst)
+    original = build_initial_solution(inst)
+
+    def breaking_search(sol, ev=None, wake=None, deadline=None):
+        uid = next(u for u, r in sol.routes.items() if len(r) > 3)
+        RouteEvaluator(sol, inst).two_opt(uid, 1, len(sol.routes[uid]) - 2)
+        res = LSResult(); res.moves['2-opt'] = 1
+        return res
+    monkeypatch.setattr(algo.local_search, 'run', breaking_search)
+    metrics = algo._compute_solution_metrics
+    monkeypatch.setattr(algo, '_compute_solution_metrics',
+                        lambda sol, conn_cache=None: {**metrics(sol, conn_cache), 'connected': sol == original})
+    seen = {}
+    monkeypatch.setattr(core.CAALNS, 'run', lambda self, initial_solution, penalties_final:
+                        seen.setdefault('init', initial_solution))
+    algo.run_full(penalties_final=cfg.penalties.__dict__)
+    assert seen['init'].sol == original and seen['init']['connected']
+    assert algo.ls_reverted == 1
+
+@pytest.mark.parametrize('pre_connected', [True, False])
+def test_cache_entry_follows_reverted_solution(monkeypatch, pre_connected):
+    inst = gen_random_instance(3, n_uav=3, n_targets=12, span=200.0, v_max=V)
+    cfg = ExperimentConfig(ConnectivityConfig(), OperatorConfig(apply_local_search=True), BudgetConfig(E_max=10),
+                           PenaltyConfig())
+    algo = core.CAALNSFull(cfg, random.Random(0), instance=inst)
+    pre = build_initial_solution(inst)
+    searched = pre.copy()
+    uid = next(u for u, r in searched.routes.items() if len(r) > 3)
+    RouteEvaluator(searched, inst).two_opt(uid, 1, len(searched.routes[uid]) - 2)
+    metrics = algo._compute_solution_metrics
+    monkeypatch.setattr(algo, '_compute_solution_metrics', lambda sol, conn_cache=None:
+                        {**metrics(sol, conn_cache), 'connected': pre_connected and sol == pre})
+    penalties = cfg.penalties.__dict__
+    cand = core.Candidate({}, searched, pending=(pre, pre, None))
+    J = algo._evaluate(cand, penalties)
+    assert algo.eval_counter.used == 1
+    # the search result's key never carries the metrics of whatever it was searched from
+    assert searched.structural_hash() not in algo.cache
+    if pre_connected:
+        assert cand.sol == pre and algo.cache.get(pre.structural_hash()) == J
+    else:
+        assert len(algo.cache) == 0
@@ -0,0 +1,69 @@
+import random
+
+import pytest
+
+from ca_alns.moves import RouteEvaluator
+from ca_alns.problem import RouteItem, build_initial_solution, gen_random_instance
+
+V = 12.0
+
+def _solution(seed):
+    """Initial solution with rally points that carry waits (some at route heads)."""
+    inst = gen_random_instance(seed, n_uav=3, n_targets=10, span=250.0, v_max=V)
+    sol = build_initial_solution(inst)
+    rng = random.Random(seed)
+    for uid in list(sol.routes):
+        for pos in (0, rng.randint(1, len(sol.routes[uid]) - 1)):
+            sol.insert_item(uid, pos, RouteItem('rp', -1, rng.uniform(-250, 250), rng.uniform(-250, 250),
+                                                wait=rng.choice([0.0, 4.0, 9.0])))
+    return inst, sol
+
+def _check(inst, sol, delta, apply):
+    ev = RouteEvaluator(sol, inst, v_default=V)
+    d = delta(ev)
+    moved = RouteEvaluator(sol.copy(), inst, v_default=V)
+    apply(moved)
+    fresh = RouteEvaluator(moved.sol, inst, v_default=V)
+    assert d.d_travel == pytest.approx(fresh.loads.sum() - ev.loads.sum(), abs=1e-9)
+    assert d.d_travel == pytest.approx(moved.sol.total_travel(inst) - sol.total_travel(inst), abs=1e-6)
+    for uid, load in d.loads.items():
+        assert load == pytest.approx(fresh.loads[fresh._slot[uid]], abs=1e-9)
+    assert d.workload_max == pytest.approx(fresh.loads.max(), abs=1e-9)
+    assert d.workload_min == pytest.approx(fresh.loads.min(), abs=1e-9)
+    assert d.makespan == pytest.approx((fresh.loads / V + fresh.waits).max(), abs=1e-9)
+    # applying refreshes only the touched routes, which must leave the caches current
+    for uid in fresh.uids:
+        assert moved.prefix[uid] == pytest.approx(fresh.prefix[uid])
+        assert moved.wait_prefix[uid] == pytest.approx(fresh.wait_prefix[uid])
+
+@pytest.mark.parametrize('seed', [0, 1])
+def test_insert_remove_delta(seed):
+    inst, sol = _solution(seed)
+    extra = RouteItem('rp', -1, 30.0, -40.0, wait=6.0)
+    for uid, route in sol.routes.items():
+        for pos in range(len(route) + 1):
+            _check(inst, sol, lambda ev: ev.insert_delta(uid, pos, extra), lambda ev: ev.insert(uid, pos, extra))
+        for pos in range(len(route)):
+            _check(inst, sol, lambda ev: ev.remove_delta(uid, pos), lambda ev: ev.remove(uid, pos))
+
+@pytest.mark.parametrize('seed', [0, 1])
+def test_relocate_delta(seed):
+    inst, sol = _solution(seed)
+    for u, ru in sol.routes.items():
+        for i in range(len(ru)):
+            for v, rv in sol.routes.items():
+                for j in range(len(rv) + (0 if u == v else 1)):
+                    if u == v and j == i:
+                        continue
+                    _check(inst, sol, lambda ev: ev.relocate_delta(u, i, v, j), lambda ev: ev.relocate(u, i, v, j))
+
+@pytest.mark.parametrize('seed', [0, 1])
+def test_swap_and_two_opt_delta(seed):
+    inst, sol = _solution(seed)
+    for u, ru in sol.routes.items():
+        for i in range(len(ru)):
+            for v, rv in sol.routes.items():
+                for j in range(len(rv)):
+                    _check(inst, sol, lambda ev: ev.swap_delta(u, i, v, j), lambda ev: ev.swap(u, i, v, j))
+            for j in range(i + 1, len(ru)):
+                _check(inst, sol, lambda ev: ev.two_opt_delta(u, i, j), lambda ev: ev.two_opt(u, i, j))
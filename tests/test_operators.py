@@ -0,0 +1,88 @@
+import random
+
+import numpy as np
+import pytest
+
+from ca_alns.moves import RouteEvaluator
+from ca_alns.operators import (_pick, default_alns_operators, greedy_insertion, random_removal, regret_insertion,
+                               worst_removal)
+from ca_alns.problem import RouteItem, build_initial_solution, gen_random_instance, route_length
+
+def _brute_insert(sol, items, inst, k):
+    """Reference regret-k (k=1: greedy) that scores every position by recomputing route lengths."""
+    sol, pending = sol.copy(), list(items)
+    while pending:
+        choice = None
+        for n, it in enumerate(pending):
+            per_route = []
+            for uid, route in sol.routes.items():
+                base = route_length(route, inst)
+                cost, pos = min((route_length(route[:p] + (it,) + route[p:], inst) - base, p)
+                                for p in range(1, len(route)))
+                per_route.append((cost, uid, pos))
+            per_route.sort()
+            regret = sum(c - per_route[0][0] for c, _, _ in per_route[1:k])
+            key = (-regret, per_route[0][0])
+            if choice is None or key < choice[0]:
+                choice = (key, n, per_route[0])
+        _, n, (_, uid, pos) = choice
+        sol.insert_item(uid, pos, pending.pop(n))
+    return sol
+
+def _layout(sol, inst):
+    # order within a route can differ on exact ties (e.g. either side of a lone target)
+    return ({uid: sorted(it.node_id for it in route) for uid, route in sol.routes.items()},
+            round(sol.total_travel(inst), 6))
+
+@pytest.mark.parametrize('k', [1, 2, 3])
+def test_insertion_matches_brute_force(k):
+    inst = gen_random_instance(5, n_uav=4, n_targets=18, span=250.0, v_max=15.0)
+    rng = random.Random(k)
+    for _ in range(5):
+        ev = RouteEvaluator(build_initial_solution(inst), inst)
+        removed = random_removal(ev, rng, 7)
+        partial = ev.sol.copy()
+        if k == 1:
+            greedy_insertion(ev, removed)
+        else:
+            regret_insertion(ev, removed, k=k)
+        assert _layout(ev.sol, inst) == _layout(_brute_insert(partial, removed, inst, k), inst)
+
+def test_regret_repairs_registered():
+    _, repair = default_alns_operators()
+    assert {'greedy', 'regret2', 'regret3'} <= set(repair)
+
+def test_removal_savings_match_recompute():
+    inst = gen_random_instance(6, n_uav=3, n_targets=12, span=250.0, v_max=15.0)
+    sol = build_initial_solution(inst)
+    ev = RouteEvaluator(sol, inst)
+    for uid, route in sol.routes.items():
+        base = route_length(route)
+        ref = [base - route_length(route[:p] + route[p+1:]) for p in range(1, len(route) - 1)]
+        assert np.allclose(ev.removal_savings(uid), ref)
+
+def _brute_worst(ev, rng, q, p=3.0):
+    """Reference worst removal: all savings recomputed and sorted in Python at every step."""
+    out = []
+    for _ in range(q):
+        cand = [(s, uid, k + 1) for uid in ev.sol.routes for k, s in enumerate(ev.removal_savings(uid).tolist())
+                if ev.sol.routes[uid][k + 1].kind == 'target']
+        if not cand:
+            break
+        cand.sort(key=lambda c: -c[0])
+        _, uid, pos = cand[_pick(rng, len(cand), p)]
+        out.append(ev.remove(uid, pos))
+    return out
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_worst_removal_matches_reference(seed):
+    inst = gen_random_instance(seed, n_uav=4, n_targets=20, span=250.0, v_max=15.0)
+    sol = build_initial_solution(inst)
+    rng = random.Random(seed)
+    for uid in list(sol.routes)[:2]:   # rally points are never removed
+        sol.insert_item(uid, 1, RouteItem('rp', -1, rng.uniform(-250, 250), rng.uniform(-250, 250)))
+    for q in (1, 6, 30):
+        ev, ev_ref = RouteEvaluator(sol.copy(), inst), RouteEvaluator(sol.copy(), inst)
+        got, ref = worst_removal(ev, random.Random(q), q), _brute_worst(ev_ref, random.Random(q), q)
+        assert got == ref and len(got) == min(q, 20)
+        assert ev.sol.routes == ev_ref.sol.routes
@@ -0,0 +1,63 @@
+import multiprocessing as mp
+
+import pytest
+
+from ca_alns.budget import SharedEvalBudget
+from ca_alns.eval import BudgetExhausted
+
+@pytest.fixture
+def fork():
+    if 'fork' not in mp.get_all_start_methods():
+        pytest.skip('needs the fork start method')
+    return mp.get_context('fork')
+
+def _drain(shared, wid, step, out):
+    budget = shared.worker(wid)
+    try:
+        while not budget.exhausted():
+            budget.tick(step)
+    except BudgetExhausted:
+        pass
+    budget.release()
+    out.put((wid, budget.used))
+
+@pytest.mark.parametrize('E_max,block,step', [(10_000, 64, 1), (9_999, 7, 1), (1_000, 16, 3)])
+def test_workers_spend_budget_exactly(fork, E_max, block, step):
+    n = 4
+    shared = SharedEvalBudget(E_max, n_workers=n, block=block, ctx=fork)
+    out = fork.Queue()
+    procs = [fork.Process(target=_drain, args=(shared, w, step, out)) for w in range(n)]
+    for p in procs:
+        p.start()
+    used = dict(out.get(timeout=60) for _ in procs)
+    for p in procs:
+        p.join()
+    # nothing is lost in unused reservations and nothing is granted twice
+    assert sum(used.values()) == shared.used == E_max - E_max % step
+    assert shared.per_worker() == [used[w] for w in range(n)]
+
+def test_release_returns_unused_reservation():
+    shared = SharedEvalBudget(100, n_workers=2, block=64)
+    a, b = shared.worker(0), shared.worker(1)
+    a.tick(5)
+    assert shared.remaining() == 36
+    a.release()
+    assert shared.remaining() == 95
+    with pytest.raises(BudgetExhausted):
+        b.tick(96)
+    assert b.used == 0 and shared.remaining() == 95 - b._local
+    b.tick(95)
+    assert b.exhausted() and a.exhausted() and shared.used == 100
+
+def test_revisits_draw_on_the_budget_but_are_not_evaluations():
+    shared = SharedEvalBudget(10, n_workers=2, block=4)
+    a, b = shared.worker(0), shared.worker(1)
+    a.tick(3)
+    a.revisit(1)   # the rest of a's block
+    a.release()
+    b.revisit(6)
+    assert a.exhausted() and b.exhausted()
+    with pytest.raises(BudgetExhausted):
+        b.revisit(1)
+    assert (shared.used, shared.revisits, shared.per_worker()) == (3, 7, [3, 0])
+    assert (a.used, a.revisits, b.used, b.revisits) == (3, 1, 0, 6)
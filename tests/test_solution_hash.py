@@ -0,0 +1,98 @@
+import dataclasses
+import json
+import pickle
+import random
+
+import pytest
+
+from ca_alns.eval import EvalCounter, FitnessCache, fitness_wrapped
+from ca_alns.fitness_store import FitnessStore
+from ca_alns.problem import RouteItem, Solution, build_initial_solution, gen_random_instance
+
+def _fresh_hash(sol):
+    return Solution(routes=dict(sol.routes)).structural_hash()
+
+def _fresh_check(sol):
+    return Solution(routes=dict(sol.routes)).cache_check()
+
+def test_incremental_hash_matches_recompute():
+    inst = gen_random_instance(0, n_uav=3, n_targets=15, span=300.0, v_max=15.0)
+    sol = build_initial_solution(inst)
+    sol.structural_hash()
+    rng = random.Random(1)
+    uids = list(sol.routes)
+    for _ in range(300):
+        uid = rng.choice(uids)
+        n = len(sol.routes[uid])
+        op = rng.random()
+        if op < 0.3 and n > 2:
+            sol.remove_item(uid, rng.randrange(1, n - 1))
+        elif op < 0.6:
+            sol.insert_item(uid, rng.randrange(1, n), RouteItem('rp', -1, rng.uniform(0, 9), rng.uniform(0, 9)))
+        elif op < 0.8:
+            sol.set_wait(uid, rng.randrange(n), rng.choice([0.0, 2.5]))
+        else:
+            i = rng.randrange(n); j = rng.randrange(i, n + 1)
+            sol.replace_items(uid, i, j, sol.routes[uid][i:j][::-1])
+        assert sol.structural_hash() == _fresh_hash(sol)
+        assert sol.cache_check() == _fresh_check(sol) != sol.structural_hash()
+
+def test_copy_is_independent():
+    inst = gen_random_instance(0, n_uav=2, n_targets=6, span=100.0, v_max=15.0)
+    sol = build_initial_solution(inst)
+    h = sol.structural_hash()
+    other = sol.copy()
+    other.remove_item(0, 1)
+    assert sol.structural_hash() == h == _fresh_hash(sol)
+    assert other.structural_hash() == _fresh_hash(other) != h
+    assert other.cache_check() == _fresh_check(other) != sol.cache_check()
+
+def test_routes_are_read_only():
+    sol = build_initial_solution(gen_random_instance(0, n_uav=2, n_targets=4, span=100.0, v_max=15.0))
+    with pytest.raises(TypeError):
+        sol.routes[0] = []
+    with pytest.raises(AttributeError):
+        sol.routes[0].append(sol.routes[0][0])
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        sol.routes[0][1].wait = 3.0
+
+def test_pickle_round_trip():
+    sol = build_initial_solution(gen_random_instance(0, n_uav=2, n_targets=4, span=100.0, v_max=15.0))
+    back = pickle.loads(pickle.dumps(sol))
+    assert back == sol and back.structural_hash() == sol.structural_hash()
+
+def test_json_round_trip():
+    sol = build_initial_solution(gen_random_instance(0, n_uav=2, n_targets=4, span=100.0, v_max=15.0))
+    sol.insert_item(1, 2, RouteItem('rp', -1, 12.5, -3.0, wait=4.0))
+    back = Solution.from_json(json.loads(json.dumps(sol.to_json())))
+    assert back == sol and back.structural_hash() == sol.structural_hash()
+
+class _Colliding:
+    """Distinct solutions that share one structural hash."""
+    def __init__(self, travel):
+        self.travel = travel
+    def structural_hash(self):
+        return 42
+    def cache_check(self):
+        return ((3,), self.travel)
+    def get(self, key, default=None):
+        return {'total_travel': self.travel}.get(key, default)
+
+def test_cache_detects_hash_collision():
+    cache, counter = FitnessCache(), EvalCounter(E_max=10)
+    a, b = _Colliding(1.0), _Colliding(2.0)
+    fit = lambda s, p: s.get('total_travel')
+    assert fitness_wrapped(fit, counter, cache, a, {}) == 1.0
+    assert fitness_wrapped(fit, counter, cache, b, {}) == 2.0
+    assert counter.used == 2 and cache.collisions == 1
+    assert fitness_wrapped(fit, counter, cache, b, {}) == 2.0
+    assert counter.used == 2
+
+def test_store_detects_hash_collision(tmp_path):
+    store = FitnessStore(str(tmp_path / "fit.sqlite"), "inst")
+    store.put(_Colliding(1.0), {}, 1.0)
+    store.flush()
+    assert store.get(_Colliding(1.0), {}) == 1.0
+    assert store.get(_Colliding(2.0), {}) is None
+    assert store.collisions == 1
+    store.close()